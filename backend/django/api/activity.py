@@ -0,0 +1,104 @@
+"""
+Per-project activity rollups (ProjectActivity).
+
+Counters are keyed by (project, creation day) and kept in step with the Task
+table: every save or delete turns into +1/-1 deltas on at most two rows.
+backfill() rebuilds them from scratch with one grouped query, and stats()
+reads a project's daily series in O(days) instead of O(tasks).
+"""
+
+from collections import defaultdict
+from datetime import date
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import ProjectActivity, Task
+
+
+def activity_key(project_id, created_at, done) -> tuple:
+    """
+    Returns:
+        tuple: (project_id, day, done) of a task, the part the rollup counts.
+    """
+    return project_id, timezone.localdate(created_at), bool(done)
+
+
+def apply_change(before, after):
+    """
+    Moves a task's contribution from the `before` to the `after` activity key.
+    Either may be None for a created or deleted task.
+    """
+    deltas = defaultdict(lambda: [0, 0])
+    for key, sign in ((before, -1), (after, 1)):
+        if key is None:
+            continue
+        project_id, day, done = key
+        deltas[(project_id, day)][0] += sign
+        deltas[(project_id, day)][1] += sign if done else 0
+
+    with transaction.atomic():
+        for (project_id, day), (created, done) in deltas.items():
+            if not created and not done:
+                continue
+            rows = ProjectActivity.objects.filter(project_id=project_id, day=day)
+            # Decrements only touch existing rows, so deleting a project
+            # (which cascades to both tables) never recreates its counters.
+            if created > 0 or done > 0:
+                ProjectActivity.objects.get_or_create(project_id=project_id, day=day)
+            rows.update(created=F("created") + created, done=F("done") + done)
+
+
+def backfill(project_id=None) -> int:
+    """
+    Rebuilds the counters from the Task table, optionally for one project.
+
+    Returns:
+        int: Number of activity rows written.
+    """
+    tasks = Task.objects.all()
+    activity = ProjectActivity.objects.all()
+    if project_id is not None:
+        tasks = tasks.filter(project_id=project_id)
+        activity = activity.filter(project_id=project_id)
+
+    rows = (
+        tasks.annotate(day=TruncDate("created_at"))
+        .values("project_id", "day")
+        .annotate(created=Count("id"), done=Count("id", filter=Q(done=True)))
+        .order_by()
+    )
+
+    with transaction.atomic():
+        activity.delete()
+        created = ProjectActivity.objects.bulk_create(
+            [ProjectActivity(**row) for row in rows], batch_size=1000
+        )
+    return len(created)
+
+
+def stats(project_id, since: date | None = None, until: date | None = None) -> dict:
+    """
+    Daily created/done counters of a project and their totals.
+    """
+    rows = ProjectActivity.objects.filter(project_id=project_id).exclude(
+        created=0, done=0
+    )
+    if since is not None:
+        rows = rows.filter(day__gte=since)
+    if until is not None:
+        rows = rows.filter(day__lte=until)
+
+    days = list(rows.order_by("day").values("day", "created", "done"))
+    totals = rows.aggregate(created=Sum("created"), done=Sum("done"))
+
+    return {
+        "project": project_id,
+        "totals": {
+            "created": totals["created"] or 0,
+            "done": totals["done"] or 0,
+        },
+        "days": days,
+    }
@@ -1,7 +1,13 @@
-"""Admin configuration for Project and Task models."""
+"""Admin configuration for Project, Task and supporting models."""
 
 from django.contrib import admin
-from .models import Project, Task
+from .models import (
+    CsvAnalysisResult,
+    Project,
+    ProjectActivity,
+    RequestProfile,
+    Task,
+)
 
 
 class TaskInline(admin.TabularInline):
@@ -40,3 +46,35 @@ class TaskAdmin(admin.ModelAdmin):
     list_filter = ("done", "created_at", "project")
     search_fields = ("title", "description")
     readonly_fields = ("created_at",)
+
+
+@admin.register(CsvAnalysisResult)
+class CsvAnalysisResultAdmin(admin.ModelAdmin):
+    """
+    Admin configuration for stored CSV analysis results.
+    """
+
+    list_display = ("file_name", "fingerprint", "created_at")
+    search_fields = ("file_name", "fingerprint")
+    readonly_fields = ("created_at",)
+
+
+@admin.register(RequestProfile)
+class RequestProfileAdmin(admin.ModelAdmin):
+    """
+    Admin configuration for stored request profiles.
+    """
+
+    list_display = ("view", "method", "status_code", "duration_ms", "created_at")
+    list_filter = ("view", "sampled")
+    readonly_fields = ("created_at",)
+
+
+@admin.register(ProjectActivity)
+class ProjectActivityAdmin(admin.ModelAdmin):
+    """
+    Admin configuration for the per-project daily activity rollup.
+    """
+
+    list_display = ("project", "day", "created", "done")
+    list_filter = ("project",)
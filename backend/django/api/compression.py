@@ -0,0 +1,197 @@
+"""
+Negotiated response compression (gzip, brotli, zstd).
+
+CompressionMiddleware picks the client's preferred encoding from
+Accept-Encoding, favouring zstd, then brotli, then gzip on equal quality.
+brotli and zstd are only offered when the `brotli` / `zstandard` packages
+are installed; gzip always is. Only API payloads (JSON, NDJSON, CSV) are
+compressed: regular responses from settings.COMPRESSION_MIN_SIZE bytes up,
+streaming responses as they are produced, flushed every STREAM_FLUSH_SIZE
+input bytes so rows keep flowing without a flush (and a near-empty block)
+per chunk.
+"""
+
+import zlib
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# API payloads only. HTML pages (admin, browsable API) carry CSRF tokens
+# and are left uncompressed, which keeps them out of reach of BREACH.
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "text/csv",
+)
+
+STREAM_FLUSH_SIZE = 16 * 1024
+
+
+class _Gzip:
+    def __init__(self):
+        self._obj = zlib.compressobj(6, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data)
+
+    def flush(self) -> bytes:
+        return self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._obj.flush()
+
+
+class _Brotli:
+    def __init__(self):
+        self._obj = brotli.Compressor(quality=5)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.process(data)
+
+    def flush(self) -> bytes:
+        return self._obj.flush()
+
+    def finish(self) -> bytes:
+        return self._obj.finish()
+
+
+class _Zstd:
+    def __init__(self):
+        self._obj = zstandard.ZstdCompressor(level=3).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data)
+
+    def flush(self) -> bytes:
+        return self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._obj.flush()
+
+
+def available_codecs() -> dict:
+    """Installed codecs by content-coding, in server preference order."""
+    codecs = {}
+    if zstandard is not None:
+        codecs["zstd"] = _Zstd
+    if brotli is not None:
+        codecs["br"] = _Brotli
+    codecs["gzip"] = _Gzip
+    return codecs
+
+
+def parse_accept_encoding(header: str) -> dict:
+    """
+    Returns:
+        dict: Quality value per content-coding, e.g. {"gzip": 1.0, "*": 0.0}.
+    """
+    qualities = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding] = quality
+    return qualities
+
+
+def negotiate_encoding(header: str) -> str | None:
+    """
+    Returns:
+        str | None: The content-coding to use, or None for no compression.
+    """
+    qualities = parse_accept_encoding(header or "")
+    best, best_quality = None, 0.0
+    for coding in available_codecs():
+        quality = qualities.get(coding, qualities.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+def compress_bytes(data: bytes, coding: str) -> bytes:
+    codec = available_codecs()[coding]()
+    return codec.compress(data) + codec.finish()
+
+
+def compress_stream(chunks, coding: str):
+    """
+    Compresses an iterable of chunks, flushing once at least
+    STREAM_FLUSH_SIZE bytes have been fed in since the last flush.
+    """
+    codec = available_codecs()[coding]()
+    unflushed = 0
+    for chunk in chunks:
+        data = codec.compress(chunk)
+        unflushed += len(chunk)
+        if unflushed >= STREAM_FLUSH_SIZE:
+            data += codec.flush()
+            unflushed = 0
+        if data:
+            yield data
+    yield codec.finish()
+
+
+def _is_compressible(response) -> bool:
+    content_type = response.get("Content-Type", "").lower()
+    return not response.has_header("Content-Encoding") and content_type.startswith(
+        COMPRESSIBLE_TYPES
+    )
+
+
+class CompressionMiddleware:
+    """
+    Compresses JSON, NDJSON and CSV responses with the negotiated
+    content-coding.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if not _is_compressible(response):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        coding = negotiate_encoding(request.headers.get("Accept-Encoding", ""))
+        if coding is None:
+            return response
+
+        if response.streaming:
+            response.streaming_content = compress_stream(
+                response.streaming_content, coding
+            )
+            del response["Content-Length"]
+        else:
+            if len(response.content) < settings.COMPRESSION_MIN_SIZE:
+                return response
+            compressed = compress_bytes(response.content, coding)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response["Content-Length"] = str(len(compressed))
+
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response["ETag"] = "W/" + etag
+        response["Content-Encoding"] = coding
+        return response
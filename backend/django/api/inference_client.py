@@ -0,0 +1,90 @@
+"""
+Pooled HTTP client for the standalone inference service (backend/python).
+
+When settings.INFERENCE_SERVICE_URL is set, the AI views forward model work
+to that service instead of running it inside the Django request cycle.
+Connections are kept in a pool of INFERENCE_SERVICE_POOL_SIZE per host, and
+failed connection attempts are retried before the service is reported as
+unavailable.
+"""
+
+import json
+import logging
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+UNAVAILABLE = ({"error": "Inference service unavailable"}, 503)
+
+_session = None
+
+
+def is_enabled() -> bool:
+    """Whether model work should be proxied to the inference service."""
+    return bool(getattr(settings, "INFERENCE_SERVICE_URL", ""))
+
+
+def get_session() -> requests.Session:
+    """Lazy-create the pooled session shared by all requests of this process."""
+    global _session
+    if _session is None:
+        pool_size = settings.INFERENCE_SERVICE_POOL_SIZE
+        adapter = HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=Retry(total=2, connect=2, read=0, status=0, backoff_factor=0.2),
+        )
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers["X-Service-Key"] = settings.INFERENCE_SERVICE_KEY
+        _session = session
+    return _session
+
+
+def _post(path: str, **kwargs) -> tuple:
+    url = f"{settings.INFERENCE_SERVICE_URL.rstrip('/')}/{path.lstrip('/')}"
+    try:
+        response = get_session().post(
+            url, timeout=settings.INFERENCE_SERVICE_TIMEOUT, **kwargs
+        )
+        return response.json(), response.status_code
+    except (requests.RequestException, ValueError) as e:
+        logger.error(f"Inference service request to {url} failed: {e}")
+        return UNAVAILABLE
+
+
+def post_json(path: str, payload: dict) -> tuple:
+    """
+    POSTs a JSON body to the inference service.
+
+    Returns:
+        tuple: (response body, status code); 503 if the service is unreachable.
+    """
+    return _post(path, json=payload)
+
+
+def analyze_csv(file, query) -> tuple:
+    """
+    Sends a CSV upload (and optional grouped query) to the inference service,
+    which answers with the analysis and its mergeable state. The file is
+    the raw request body, so it is streamed from disk rather than read into
+    a multipart body first.
+
+    Returns:
+        tuple: (response body, status code); 503 if the service is unreachable.
+    """
+    file.seek(0)
+    params = {"fileName": file.name}
+    if query:
+        params["query"] = json.dumps(query)
+    return _post(
+        "api/ai/csv/stream/",
+        params=params,
+        data=file,
+        headers={"Content-Type": "text/csv"},
+    )
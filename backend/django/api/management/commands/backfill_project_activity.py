@@ -0,0 +1,23 @@
+"""
+Rebuilds the ProjectActivity rollup from the Task table.
+
+Usage:
+    python manage.py backfill_project_activity [--project ID]
+"""
+
+from django.core.management.base import BaseCommand
+
+from api.activity import backfill
+
+
+class Command(BaseCommand):
+    help = "Rebuild per-project daily task counters from the Task table."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--project", type=int, help="Only rebuild the counters of this project."
+        )
+
+    def handle(self, *args, **options):
+        rows = backfill(options["project"])
+        self.stdout.write(self.style.SUCCESS(f"Wrote {rows} activity rows."))
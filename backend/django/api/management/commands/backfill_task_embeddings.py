@@ -0,0 +1,18 @@
+"""
+Recomputes the TaskEmbedding vectors used by similarity search.
+
+Usage:
+    python manage.py backfill_task_embeddings
+"""
+
+from django.core.management.base import BaseCommand
+
+from api.similarity import backfill_embeddings
+
+
+class Command(BaseCommand):
+    help = "Embed every task for similarity search and duplicate detection."
+
+    def handle(self, *args, **options):
+        count = backfill_embeddings()
+        self.stdout.write(self.style.SUCCESS(f"Embedded {count} tasks."))
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 22:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0002_csvanalysisresult"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="csvanalysisresult",
+            name="state",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.8 on 2026-10-18 22:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0005_projectactivity"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TaskEmbedding",
+            fields=[
+                (
+                    "task",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="embedding",
+                        serialize=False,
+                        to="api.task",
+                    ),
+                ),
+                ("vector", models.BinaryField()),
+            ],
+        ),
+    ]
@@ -1,6 +1,6 @@
 """Database models for managing projects and their related tasks."""
 
-from django.db import models
+from django.db import models, transaction
 
 
 class Project(models.Model):
@@ -43,6 +43,15 @@ class Task(models.Model):
     done = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    def save(self, *args, **kwargs):
+        """
+        Saves the task in one transaction with its signal handlers, so the
+        row locked in pre_save (api/signals.py) stays locked until the
+        ProjectActivity counters are updated.
+        """
+        with transaction.atomic(using=kwargs.get("using")):
+            super().save(*args, **kwargs)
+
     def __str__(self) -> str:
         """
         Returns a human-readable string representation of the task.
@@ -51,3 +60,150 @@ class Task(models.Model):
             str: The task's title.
         """
         return str(self.title)
+
+
+class CsvAnalysisResult(models.Model):
+    """
+    Stores the outcome of a CSV analysis so repeat uploads can be served
+    without parsing the file again.
+
+    Attributes:
+        fingerprint (str): SHA-256 hex digest of the uploaded file contents.
+        options_key (str): SHA-256 hex digest of the canonical analysis options.
+        file_name (str): Name of the file the result was first computed for.
+        result (dict): The JSON payload returned by the CSV analysis endpoint.
+        state (dict): Mergeable per-column statistics used to extend the
+            result with appended rows.
+        created_at (datetime): The timestamp when the result was stored.
+    """
+
+    fingerprint = models.CharField(max_length=64)
+    options_key = models.CharField(max_length=64)
+    file_name = models.CharField(max_length=255)
+    result = models.JSONField()
+    state = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        """Each file/options combination is analysed at most once."""
+
+        constraints = [
+            models.UniqueConstraint(
+                fields=["fingerprint", "options_key"],
+                name="unique_csv_fingerprint_options",
+            )
+        ]
+
+    def __str__(self) -> str:
+        """
+        Returns a human-readable string representation of the stored result.
+
+        Returns:
+            str: The file name and a short fingerprint prefix.
+        """
+        return f"{self.file_name} ({self.fingerprint[:12]})"
+
+
+class RequestProfile(models.Model):
+    """
+    A stored profile of a single API request (see api/profiling.py).
+
+    Attributes:
+        view (str): Name of the profiled view.
+        method (str): HTTP method of the request.
+        path (str): Request path including the query string.
+        status_code (int): Response status code.
+        sampled (bool): Whether the request was picked by sampling
+            rather than requested with the X-Profile header.
+        duration_ms (float): Wall-clock time spent in the view.
+        query_count (int): Number of SQL queries executed.
+        queries (list): SQL statements with their durations in ms.
+        stacks (str): Sampled call stacks in collapsed ("folded") format.
+        created_at (datetime): The timestamp when the profile was stored.
+    """
+
+    view = models.CharField(max_length=100)
+    method = models.CharField(max_length=10)
+    path = models.CharField(max_length=2048)
+    status_code = models.PositiveSmallIntegerField()
+    sampled = models.BooleanField(default=False)
+    duration_ms = models.FloatField()
+    query_count = models.PositiveIntegerField(default=0)
+    queries = models.JSONField(default=list, blank=True)
+    stacks = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self) -> str:
+        """
+        Returns a human-readable string representation of the profile.
+
+        Returns:
+            str: The view name and duration.
+        """
+        return f"{self.view} ({self.duration_ms:.1f} ms)"
+
+
+class ProjectActivity(models.Model):
+    """
+    Daily task counters of a project, kept up to date by api/signals.py.
+
+    Tasks are bucketed by the day they were created, so a row answers
+    "how many tasks created on this day exist, and how many of them are done"
+    without scanning the Task table.
+
+    Attributes:
+        project (Project): The project the counters belong to.
+        day (date): The creation day of the counted tasks.
+        created (int): Number of tasks created on that day.
+        done (int): How many of those tasks are done.
+    """
+
+    project = models.ForeignKey(
+        Project, related_name="activity", on_delete=models.CASCADE
+    )
+    day = models.DateField()
+    created = models.IntegerField(default=0)
+    done = models.IntegerField(default=0)
+
+    class Meta:
+        """One row per project and day."""
+
+        constraints = [
+            models.UniqueConstraint(
+                fields=["project", "day"], name="unique_project_activity_day"
+            )
+        ]
+
+    def __str__(self) -> str:
+        """
+        Returns a human-readable string representation of the counters.
+
+        Returns:
+            str: The project ID, day and counters.
+        """
+        return f"{self.project_id} {self.day}: {self.created} created, {self.done} done"
+
+
+class TaskEmbedding(models.Model):
+    """
+    Hashed TF-IDF term vector of a task's title and description, kept up to
+    date by api/signals.py and searched by api/similarity.py.
+
+    Attributes:
+        task (Task): The embedded task.
+        vector (bytes): float32 term frequencies (EMBEDDING_DIM values).
+    """
+
+    task = models.OneToOneField(
+        Task, primary_key=True, related_name="embedding", on_delete=models.CASCADE
+    )
+    vector = models.BinaryField()
+
+    def __str__(self) -> str:
+        """
+        Returns a human-readable string representation of the embedding.
+
+        Returns:
+            str: The task ID.
+        """
+        return f"Embedding of task {self.task_id}"
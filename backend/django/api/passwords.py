@@ -0,0 +1,49 @@
+"""
+Parallel password hashing for bulk user registration.
+
+make_password() runs the configured hasher (PBKDF2 by default), which is
+CPU-bound and holds the GIL, so batches are hashed in a process pool of
+settings.PASSWORD_HASH_WORKERS workers. The pool is created on first use
+and reused by later requests of the same process.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+
+_pool = None
+
+
+def _init_worker():
+    """Makes sure Django is configured in workers that were not forked."""
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """Lazy-create the process pool shared by all requests of this process."""
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.PASSWORD_HASH_WORKERS, initializer=_init_worker
+        )
+    return _pool
+
+
+def hash_passwords(passwords: list) -> list:
+    """
+    Hashes the passwords with make_password(), in parallel for batches.
+
+    Returns:
+        list: Encoded password hashes, in input order.
+    """
+    if len(passwords) < 2:
+        return [make_password(password) for password in passwords]
+
+    workers = settings.PASSWORD_HASH_WORKERS
+    chunksize = max(1, len(passwords) // (workers * 4))
+    return list(get_pool().map(make_password, passwords, chunksize=chunksize))
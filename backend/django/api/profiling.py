@@ -0,0 +1,218 @@
+"""
+Opt-in request profiling for slow API calls.
+
+Views wrapped with @profiled record a RequestProfile when
+settings.PROFILING_ENABLED is set and either:
+    - the caller sends "X-Profile: 1" and is a staff user or presents the
+      service key (X-Service-Key), or
+    - the request is picked at settings.PROFILING_SAMPLE_RATE.
+
+A profile holds the call stacks sampled every PROFILING_INTERVAL seconds in
+collapsed ("folded") format, which flamegraph.pl and speedscope read
+directly, plus every SQL statement with its duration. For streaming
+responses the profile is completed once the stream has been sent. Only the
+newest settings.PROFILING_MAX_PROFILES profiles are kept. With profiling
+disabled the wrapper costs one settings lookup per request.
+"""
+
+import functools
+import random
+import sys
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import connection
+from rest_framework.views import APIView
+
+from .models import RequestProfile
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+MAX_PROFILED_QUERIES = 1000
+
+
+def is_profiler(request) -> bool:
+    """Whether the caller may request profiles and download them."""
+    expected_key = getattr(settings, "DJANGO_SERVICE_KEY", None)
+    if expected_key and request.headers.get("X-Service-Key") == expected_key:
+        return True
+    user = getattr(request, "user", None)
+    return bool(user and user.is_staff)
+
+
+def _should_profile(request) -> tuple:
+    """
+    Returns:
+        tuple: (profile this request, picked by sampling)
+    """
+    if request.headers.get(PROFILE_HEADER) == "1" and is_profiler(request):
+        return True, False
+    rate = settings.PROFILING_SAMPLE_RATE
+    if rate > 0 and random.random() < rate:
+        return True, True
+    return False, False
+
+
+class StackSampler:
+    """
+    Samples the call stack of one thread from a background thread and
+    counts identical stacks, trimmed to the frames below `root`.
+    """
+
+    def __init__(self, root, interval: float, counts: Counter):
+        self.root = root
+        self.interval = interval
+        self.counts = counts
+        self._target = threading.get_ident()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            stack = []
+            while frame is not None and frame is not self.root:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({code.co_filename}:{frame.f_lineno})")
+                frame = frame.f_back
+            if stack and frame is self.root:
+                self.counts[";".join(reversed(stack))] += 1
+
+
+class QueryRecorder:
+    """connection.execute_wrapper that logs each statement and its duration."""
+
+    def __init__(self):
+        self.queries = []
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            if len(self.queries) < MAX_PROFILED_QUERIES:
+                elapsed = (time.perf_counter() - start) * 1000
+                self.queries.append({"sql": sql, "ms": round(elapsed, 3)})
+
+
+class ProfileCapture:
+    """Accumulates time, SQL queries and sampled stacks over one or more calls."""
+
+    def __init__(self):
+        self.recorder = QueryRecorder()
+        self.counts = Counter()
+        self.duration = 0.0
+
+    def run(self, func, *args, **kwargs):
+        sampler = StackSampler(
+            sys._getframe(), settings.PROFILING_INTERVAL, self.counts
+        )
+        sampler.start()
+        start = time.perf_counter()
+        try:
+            with connection.execute_wrapper(self.recorder):
+                return func(*args, **kwargs)
+        finally:
+            self.duration += (time.perf_counter() - start) * 1000
+            sampler.stop()
+
+    def fields(self) -> dict:
+        """RequestProfile fields of what was captured so far."""
+        return {
+            "duration_ms": round(self.duration, 3),
+            "query_count": self.recorder.count,
+            "queries": self.recorder.queries,
+            "stacks": "".join(
+                f"{stack} {count}\n" for stack, count in self.counts.items()
+            ),
+        }
+
+
+def prune_profiles(keep: int) -> int:
+    """
+    Deletes all but the newest `keep` profiles.
+
+    Returns:
+        int: Number of profiles deleted.
+    """
+    newest = RequestProfile.objects.order_by("-id").values_list("id", flat=True)
+    cutoff = newest[keep : keep + 1].first()
+    if cutoff is None:
+        return 0
+    return RequestProfile.objects.filter(id__lte=cutoff).delete()[0]
+
+
+def _profile_stream(capture: ProfileCapture, chunks, profile_id: int):
+    """
+    Keeps profiling while a streaming response is consumed (that is when
+    streamed lists run their queries), with one stack sampler for the whole
+    stream, then updates the stored profile.
+    """
+    chunks = iter(chunks)
+    sampler = StackSampler(sys._getframe(), settings.PROFILING_INTERVAL, capture.counts)
+    sampler.start()
+    try:
+        with connection.execute_wrapper(capture.recorder):
+            while True:
+                start = time.perf_counter()
+                chunk = next(chunks, None)
+                capture.duration += (time.perf_counter() - start) * 1000
+                if chunk is None:
+                    break
+                yield chunk
+    finally:
+        sampler.stop()
+    RequestProfile.objects.filter(pk=profile_id).update(**capture.fields())
+
+
+def profiled(name: str):
+    """
+    Decorator for function views and viewset actions that records a
+    RequestProfile for requests selected by the header or sampling.
+    """
+
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if not settings.PROFILING_ENABLED:
+                return view(*args, **kwargs)
+
+            # Viewset actions receive (self, request, ...).
+            request = args[1] if isinstance(args[0], APIView) else args[0]
+            enabled, sampled = _should_profile(request)
+            if not enabled:
+                return view(*args, **kwargs)
+
+            capture = ProfileCapture()
+            response = capture.run(view, *args, **kwargs)
+
+            profile = RequestProfile.objects.create(
+                view=name,
+                method=request.method,
+                path=request.get_full_path()[:2048],
+                status_code=response.status_code,
+                sampled=sampled,
+                **capture.fields(),
+            )
+            prune_profiles(settings.PROFILING_MAX_PROFILES)
+            response[PROFILE_ID_HEADER] = str(profile.id)
+            if response.streaming:
+                response.streaming_content = _profile_stream(
+                    capture, response.streaming_content, profile.id
+                )
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,68 @@
+"""
+Signal handlers that keep Task-derived data in step with the Task table:
+the ProjectActivity rollup and the TaskEmbedding similarity vectors.
+"""
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import similarity
+from .activity import activity_key, apply_change
+from .models import Task
+
+
+@receiver(pre_save, sender=Task)
+def remember_task_state(sender, instance, raw=False, **kwargs):
+    """
+    Stores the task's activity key and text as they are in the database.
+
+    The row is read with SELECT ... FOR UPDATE (Task.save runs in a
+    transaction), so concurrent saves of the same task apply their counter
+    changes one after the other instead of both starting from the same state.
+    """
+    instance._activity_before = None
+    instance._text_before = None
+    if raw or instance.pk is None:
+        return
+    row = (
+        Task.objects.select_for_update()
+        .filter(pk=instance.pk)
+        .values_list("project_id", "created_at", "done", "title", "description")
+        .first()
+    )
+    if row is not None:
+        instance._activity_before = activity_key(*row[:3])
+        instance._text_before = row[3:]
+
+
+@receiver(post_save, sender=Task)
+def update_activity_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    before = getattr(instance, "_activity_before", None)
+    after = activity_key(instance.project_id, instance.created_at, instance.done)
+    if before != after:
+        apply_change(before, after)
+
+
+@receiver(post_save, sender=Task)
+def update_embedding_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    if getattr(instance, "_text_before", None) != (
+        instance.title,
+        instance.description,
+    ):
+        similarity.index_task(instance)
+
+
+@receiver(post_delete, sender=Task)
+def update_activity_on_delete(sender, instance, **kwargs):
+    apply_change(
+        activity_key(instance.project_id, instance.created_at, instance.done), None
+    )
+
+
+@receiver(post_delete, sender=Task)
+def remove_embedding_on_delete(sender, instance, **kwargs):
+    similarity.unindex_task(instance.pk)
@@ -0,0 +1,621 @@
+"""
+Task similarity search and duplicate detection.
+
+Each task's title and description are embedded as a signed, hashed term
+vector (word unigrams and bigrams, sublinear term frequency) of
+EMBEDDING_DIM float32 values and stored in TaskEmbedding. The vectors do not
+depend on the rest of the corpus, so saving a task only re-embeds that task.
+
+Queries run against an in-memory VectorIndex shared by the process. IDF
+weights are derived from the indexed vectors. Up to ANN_MIN_SIZE tasks, the
+cosine scores of all tasks come from one NumPy matrix product (exact);
+larger indexes first narrow the rows down with random-hyperplane LSH tables
+and score only those (approximate, a few milliseconds per query at 10^6).
+The index is rebuilt from TaskEmbedding in a background thread every
+INDEX_MAX_AGE seconds and swapped in, so requests never wait for a reload.
+"""
+
+import logging
+import re
+import threading
+import time
+import zlib
+from collections import Counter
+from itertools import pairwise
+from math import log
+
+import numpy as np
+from django.db import connection
+
+from .models import Task, TaskEmbedding
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_DIM = 256
+DEFAULT_TOP_K = 10
+MAX_TOP_K = 100
+DEDUP_THRESHOLD = 0.8
+DEDUP_BATCH_SIZE = 4096
+SCORE_BUDGET = 2**24
+MAX_DEDUP_PAIRS = 1000
+MAX_DEDUP_QUERIES = 1000
+INDEX_MAX_AGE = 300
+IDF_REFRESH_RATIO = 0.05
+ANN_MIN_SIZE = 100_000
+LSH_TABLES = 16
+LSH_BITS = 10
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def embed_text(text: str) -> np.ndarray:
+    """
+    Returns the L2-normalised hashed term vector of the text.
+    """
+    tokens = _TOKEN_RE.findall(text.lower())
+    features = Counter(tokens)
+    features.update(f"{a} {b}" for a, b in pairwise(tokens))
+
+    vector = np.zeros(EMBEDDING_DIM, dtype=np.float32)
+    for feature, count in features.items():
+        h = zlib.crc32(feature.encode())
+        sign = 1.0 if h & 0x80000000 else -1.0
+        vector[h % EMBEDDING_DIM] += sign * (1.0 + log(count))
+
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def embed_task(task) -> np.ndarray:
+    return embed_text(f"{task.title}\n{task.description}")
+
+
+def to_bytes(vector: np.ndarray) -> bytes:
+    return vector.astype("<f4").tobytes()
+
+
+def from_bytes(data) -> np.ndarray:
+    return np.frombuffer(bytes(data), dtype="<f4")
+
+
+def _cosine_scores(
+    queries: np.ndarray, matrix: np.ndarray, norms: np.ndarray, idf: np.ndarray
+) -> np.ndarray:
+    """IDF-weighted cosine scores of each query against the matrix rows."""
+    weighted = queries * (idf**2)
+    query_norms = np.sqrt((queries**2) @ (idf**2))
+    query_norms[query_norms == 0] = 1
+
+    scores = weighted @ matrix.T
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scores = scores / norms / query_norms[:, None]
+    scores[:, norms == 0] = -np.inf
+    return scores
+
+
+class LshTables:
+    """
+    Random-hyperplane LSH over IDF-weighted vectors, the approximate
+    candidate filter used once an index holds ANN_MIN_SIZE tasks.
+
+    Each of LSH_TABLES tables buckets rows by the signs of LSH_BITS
+    projections; tasks with cosine similarity 0.9 share a bucket in at least
+    one table ~98% of the time (0.8: ~80%). Candidates are re-scored exactly.
+    """
+
+    def __init__(self, idf: np.ndarray, seed: int = 0):
+        rng = np.random.default_rng(seed)
+        planes = rng.standard_normal((EMBEDDING_DIM, LSH_TABLES * LSH_BITS))
+        self._planes = (planes * idf[:, None]).astype(np.float32)
+        self._powers = 1 << np.arange(LSH_BITS, dtype=np.int64)
+        self._buckets = [{} for _ in range(LSH_TABLES)]
+
+    def signatures(self, vectors: np.ndarray) -> np.ndarray:
+        """Returns an (n, LSH_TABLES) array of bucket keys."""
+        bits = (vectors @ self._planes > 0).reshape(-1, LSH_TABLES, LSH_BITS)
+        return bits @ self._powers
+
+    def build(self, matrix: np.ndarray):
+        signatures = np.concatenate(
+            [
+                self.signatures(matrix[start : start + 65536])
+                for start in range(0, len(matrix), 65536)
+            ]
+        )
+        for table, buckets in enumerate(self._buckets):
+            order = np.argsort(signatures[:, table], kind="stable")
+            keys, starts = np.unique(signatures[order, table], return_index=True)
+            buckets.update(zip(keys.tolist(), np.split(order, starts[1:])))
+
+    def add(self, row: int, vector: np.ndarray):
+        # Rows left behind in a vector's old buckets only cost a re-score.
+        for buckets, key in zip(self._buckets, self.signatures(vector)[0].tolist()):
+            bucket = buckets.get(key)
+            if bucket is None:
+                buckets[key] = np.array([row])
+            elif row not in bucket:
+                buckets[key] = np.append(bucket, row)
+
+    def candidates(self, signature: np.ndarray) -> np.ndarray:
+        found = [
+            buckets[key]
+            for buckets, key in zip(self._buckets, signature.tolist())
+            if key in buckets
+        ]
+        if not found:
+            return np.empty(0, dtype=np.int64)
+        return np.unique(np.concatenate(found))
+
+
+class VectorIndex:
+    """
+    Growable float32 matrix of task vectors with IDF-weighted cosine search.
+
+    Rows of removed tasks are zeroed and reused by later inserts. Queries
+    score every row (exact) until the index reaches ANN_MIN_SIZE tasks, then
+    only the rows LshTables proposes (approximate). Duplicate reports score
+    copies outside the lock, and IDF weights that drifted are recomputed on
+    a copy in the background, so neither holds up upsert().
+    """
+
+    def __init__(self, capacity: int = 1024, ann_min_size: int | None = None):
+        self._lock = threading.Lock()
+        self._matrix = np.zeros((capacity, EMBEDDING_DIM), dtype=np.float32)
+        self._ids = np.full(capacity, -1, dtype=np.int64)
+        self._rows = {}
+        self._free = []
+        self._size = 0
+        self._df = np.zeros(EMBEDDING_DIM, dtype=np.int64)
+        self._idf = None
+        self._norms = np.zeros(capacity, dtype=np.float32)
+        self._idf_count = 0
+        self._lsh = None
+        # Rows written while refresh_weights() works on a copy, else None.
+        self._dirty = None
+        self.ann_min_size = ANN_MIN_SIZE if ann_min_size is None else ann_min_size
+        self.loaded_at = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, task_id) -> bool:
+        return task_id in self._rows
+
+    @property
+    def approximate(self) -> bool:
+        """Whether queries are answered through the LSH tables."""
+        return self._lsh is not None
+
+    def _grow(self):
+        capacity = max(len(self._ids) * 2, 1024)
+        matrix = np.zeros((capacity, EMBEDDING_DIM), dtype=np.float32)
+        matrix[: self._size] = self._matrix[: self._size]
+        ids = np.full(capacity, -1, dtype=np.int64)
+        ids[: self._size] = self._ids[: self._size]
+        norms = np.zeros(capacity, dtype=np.float32)
+        norms[: self._size] = self._norms[: self._size]
+        self._matrix, self._ids, self._norms = matrix, ids, norms
+
+    def _row_norms(self, rows: slice | int) -> np.ndarray:
+        return np.sqrt((self._matrix[rows] ** 2) @ (self._idf**2))
+
+    @staticmethod
+    def _weights(matrix: np.ndarray, df: np.ndarray, count: int, ann: bool) -> tuple:
+        """
+        Returns:
+            tuple: (IDF, row norms, LshTables or None) for the given rows
+                and document frequencies.
+        """
+        idf = (np.log((1 + count) / (1 + df)) + 1).astype(np.float32)
+        norms = np.empty(len(matrix), dtype=np.float32)
+        for start in range(0, len(matrix), 65536):
+            rows = slice(start, start + 65536)
+            norms[rows] = np.sqrt((matrix[rows] ** 2) @ (idf**2))
+
+        lsh = None
+        if ann:
+            lsh = LshTables(idf)
+            lsh.build(matrix)
+        return idf, norms, lsh
+
+    def _install_weights(self, count: int, idf, norms, lsh):
+        self._idf, self._idf_count, self._lsh = idf, count, lsh
+        self._norms = np.zeros(len(self._ids), dtype=np.float32)
+        self._norms[: len(norms)] = norms
+
+    def _refresh_weights(self):
+        """
+        Recomputes IDF from the current document frequencies, all row norms
+        and, for large indexes, the LSH tables. Runs under the lock; used
+        only for an index that never had weights.
+        """
+        count = len(self._rows)
+        weights = self._weights(
+            self._matrix[: self._size], self._df, count, count >= self.ann_min_size
+        )
+        self._install_weights(count, *weights)
+
+    def refresh_weights(self):
+        """
+        Like _refresh_weights(), but computed outside the lock, which is
+        only held to copy the document frequencies and to install the
+        result. Rows written in between (which the computation may have
+        read half-written) are re-normed and re-bucketed on install.
+        """
+        with self._lock:
+            if self._dirty is not None:
+                return
+            self._dirty = set()
+            count = len(self._rows)
+            matrix = self._matrix[: self._size]
+            df = self._df.copy()
+
+        weights = None
+        try:
+            weights = self._weights(matrix, df, count, count >= self.ann_min_size)
+        finally:
+            with self._lock:
+                if weights is not None:
+                    self._install_weights(count, *weights)
+                    lsh = self._lsh
+                    for row in self._dirty:
+                        self._norms[row] = self._row_norms(row)
+                        if lsh is not None and self._ids[row] != -1:
+                            lsh.add(row, self._matrix[row])
+                self._dirty = None
+
+    def _refresh_in_background(self):
+        try:
+            self.refresh_weights()
+        except Exception:
+            logger.exception("Refreshing the task similarity weights failed")
+
+    def _ensure_weights(self):
+        """
+        Called under the lock before a query: computes missing weights, and
+        starts a background refresh of weights that drifted.
+        """
+        if self._idf is None:
+            self._refresh_weights()
+        elif self._weights_stale() and self._dirty is None:
+            threading.Thread(target=self._refresh_in_background, daemon=True).start()
+
+    def _weights_stale(self) -> bool:
+        if self._idf is None:
+            return True
+        drift = abs(len(self._rows) - self._idf_count)
+        return drift > IDF_REFRESH_RATIO * max(self._idf_count, 1)
+
+    def upsert(self, task_id: int, vector: np.ndarray):
+        with self._lock:
+            row = self._rows.get(task_id)
+            if row is None:
+                if self._free:
+                    row = self._free.pop()
+                else:
+                    if self._size == len(self._ids):
+                        self._grow()
+                    row = self._size
+                    self._size += 1
+                self._rows[task_id] = row
+                self._ids[row] = task_id
+            else:
+                self._df -= self._matrix[row] != 0
+
+            self._matrix[row] = vector
+            self._df += vector != 0
+            if self._idf is not None:
+                self._norms[row] = self._row_norms(row)
+            if self._lsh is not None:
+                self._lsh.add(row, vector)
+            if self._dirty is not None:
+                self._dirty.add(row)
+
+    def remove(self, task_id: int):
+        with self._lock:
+            row = self._rows.pop(task_id, None)
+            if row is None:
+                return
+            self._df -= self._matrix[row] != 0
+            self._matrix[row] = 0
+            self._ids[row] = -1
+            self._norms[row] = 0
+            self._free.append(row)
+            if self._dirty is not None:
+                self._dirty.add(row)
+
+    def task_ids(self) -> list:
+        return list(self._rows)
+
+    def vector(self, task_id: int) -> np.ndarray | None:
+        row = self._rows.get(task_id)
+        return None if row is None else self._matrix[row].copy()
+
+    def _scores(self, queries: np.ndarray, rows: np.ndarray | slice) -> np.ndarray:
+        """Cosine scores of each query against the given index rows."""
+        return _cosine_scores(queries, self._matrix[rows], self._norms[rows], self._idf)
+
+    @staticmethod
+    def _top_k(scores: np.ndarray, k: int) -> tuple:
+        """
+        Returns:
+            tuple: (column indices, scores) of the k best columns per row.
+        """
+        k = min(k, scores.shape[1])
+        if k <= 0:
+            empty = np.empty((scores.shape[0], 0), dtype=np.int64)
+            return empty, empty.astype(np.float32)
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        return (
+            np.take_along_axis(top, order, axis=1),
+            np.take_along_axis(top_scores, order, axis=1),
+        )
+
+    def _query(self, vectors: np.ndarray, k: int, exclude_rows) -> list:
+        """
+        Top-k (row, score) lists for each query vector; exclude_rows[i]
+        (or None) is left out of query i's results.
+        """
+        results = []
+        if self._lsh is not None:
+            signatures = self._lsh.signatures(vectors)
+            for vector, signature, exclude in zip(vectors, signatures, exclude_rows):
+                rows = self._lsh.candidates(signature)
+                rows = rows[rows != exclude]
+                top, scores = self._top_k(self._scores(vector[None, :], rows), k)
+                results.append(list(zip(rows[top[0]], scores[0])))
+            return results
+
+        # Bounds the score matrix of a batch to SCORE_BUDGET floats.
+        rows = slice(0, self._size)
+        batch_size = max(1, SCORE_BUDGET // max(self._size, 1))
+        for start in range(0, len(vectors), batch_size):
+            batch = vectors[start : start + batch_size]
+            scores = self._scores(batch, rows)
+            for i, exclude in enumerate(exclude_rows[start : start + batch_size]):
+                if exclude is not None:
+                    scores[i, exclude] = -np.inf
+            top, top_scores = self._top_k(scores, k)
+            results.extend(list(zip(t, s)) for t, s in zip(top, top_scores))
+        return results
+
+    def search(self, vector: np.ndarray, k: int, exclude: int | None = None) -> list:
+        """
+        Returns:
+            list: Up to k (task_id, score) pairs, best first.
+        """
+        with self._lock:
+            self._ensure_weights()
+            [matches] = self._query(vector[None, :], k, [self._rows.get(exclude)])
+            return [
+                (int(self._ids[row]), round(float(score), 4))
+                for row, score in matches
+                if np.isfinite(score)
+            ]
+
+    def duplicates(self, task_ids, k: int, threshold: float) -> list:
+        """
+        Runs a top-k query for each of the given tasks and returns the pairs
+        scoring at least `threshold`, each pair once.
+
+        Only copying happens under the lock: the whole matrix for exact
+        scoring, or each query's LSH candidate rows for approximate scoring.
+
+        Returns:
+            list: (task_id, duplicate_id, score) tuples, best first.
+        """
+        with self._lock:
+            self._ensure_weights()
+            rows = [
+                self._rows[task_id] for task_id in task_ids if task_id in self._rows
+            ]
+            vectors = self._matrix[rows]
+            queried = self._ids[rows]
+            lsh = self._lsh
+            if lsh is None:
+                size = self._size
+                matrix = self._matrix[:size].copy()
+                norms = self._norms[:size].copy()
+                ids = self._ids[:size].copy()
+                idf = self._idf
+
+        pairs = {}
+
+        def add_matches(task_id: int, other_ids: np.ndarray, scores: np.ndarray):
+            for other, score in zip(other_ids.tolist(), scores.tolist()):
+                if score < threshold:
+                    break
+                key = (min(task_id, other), max(task_id, other))
+                pairs[key] = round(score, 4)
+
+        if lsh is not None:
+            for task_id, vector, signature in zip(
+                queried.tolist(), vectors, lsh.signatures(vectors)
+            ):
+                with self._lock:
+                    candidates = lsh.candidates(signature)
+                    matrix = self._matrix[candidates]
+                    norms = self._norms[candidates]
+                    ids = self._ids[candidates]
+                    idf = self._idf
+                scores = _cosine_scores(vector[None, :], matrix, norms, idf)
+                scores[:, ids == task_id] = -np.inf
+                top, top_scores = self._top_k(scores, k)
+                add_matches(task_id, ids[top[0]], top_scores[0])
+        else:
+            # Bounds the score matrix of a batch to SCORE_BUDGET floats.
+            batch_size = max(1, SCORE_BUDGET // max(len(matrix), 1))
+            for start in range(0, len(rows), batch_size):
+                batch = rows[start : start + batch_size]
+                scores = _cosine_scores(
+                    vectors[start : start + len(batch)], matrix, norms, idf
+                )
+                scores[np.arange(len(batch)), batch] = -np.inf
+                top, top_scores = self._top_k(scores, k)
+                for task_id, t, s in zip(queried[start:].tolist(), top, top_scores):
+                    add_matches(task_id, ids[t], s)
+
+        ordered = sorted(pairs.items(), key=lambda item: -item[1])
+        return [(a, b, score) for (a, b), score in ordered]
+
+
+_index = None
+_index_lock = threading.Lock()
+_index_loaded = threading.Condition(_index_lock)
+_reloading = False
+_generation = 0
+# Writes made while an index is being loaded, replayed before it is swapped in.
+_pending = []
+
+
+def load_index() -> VectorIndex:
+    """
+    Builds an index from all stored embeddings, with its weights computed
+    before anyone can query it.
+    """
+    index = VectorIndex(capacity=max(TaskEmbedding.objects.count(), 1024))
+    rows = TaskEmbedding.objects.values_list("task_id", "vector")
+    for task_id, data in rows.iterator(chunk_size=5000):
+        index.upsert(task_id, from_bytes(data))
+    index.refresh_weights()
+    return index
+
+
+def _reload_index(generation: int) -> VectorIndex | None:
+    """
+    Loads a new index and swaps it in, unless reset_index() was called in
+    the meantime.
+    """
+    global _index, _reloading
+    index = None
+    try:
+        index = load_index()
+    finally:
+        with _index_lock:
+            if index is not None and generation == _generation:
+                for task_id, vector in _pending:
+                    if vector is None:
+                        index.remove(task_id)
+                    else:
+                        index.upsert(task_id, vector)
+                _index = index
+            _pending.clear()
+            _reloading = False
+            _index_loaded.notify_all()
+    return index
+
+
+def _rebuild_in_background(generation: int):
+    try:
+        _reload_index(generation)
+    except Exception:
+        logger.exception("Rebuilding the task similarity index failed")
+    finally:
+        connection.close()
+
+
+def get_index() -> VectorIndex:
+    """
+    Returns the process-wide index. The first call loads it; after that it
+    is rebuilt in a background thread every INDEX_MAX_AGE seconds, to pick
+    up tasks written by other processes, while callers keep the current one.
+    """
+    global _reloading
+    with _index_lock:
+        while _index is None and _reloading:
+            _index_loaded.wait()
+        index = _index
+        if _reloading or (
+            index is not None and time.monotonic() - index.loaded_at <= INDEX_MAX_AGE
+        ):
+            return index
+        _reloading = True
+        generation = _generation
+
+    if index is None:
+        return _reload_index(generation)
+    threading.Thread(
+        target=_rebuild_in_background, args=(generation,), daemon=True
+    ).start()
+    return index
+
+
+def reset_index():
+    """Drops the in-memory index; the next query reloads it."""
+    global _index, _generation
+    with _index_lock:
+        _index = None
+        _generation += 1
+
+
+def _update_index(task_id: int, vector: np.ndarray | None):
+    """Upserts (or, for None, removes) a task in the loaded index, if any."""
+    with _index_lock:
+        index = _index
+        if _reloading:
+            _pending.append((task_id, vector))
+    if index is None:
+        return
+    if vector is None:
+        index.remove(task_id)
+    else:
+        index.upsert(task_id, vector)
+
+
+def index_task(task):
+    """Stores the task's embedding and updates the loaded index, if any."""
+    vector = embed_task(task)
+    TaskEmbedding.objects.update_or_create(
+        task_id=task.pk, defaults={"vector": to_bytes(vector)}
+    )
+    _update_index(task.pk, vector)
+
+
+def unindex_task(task_id: int):
+    _update_index(task_id, None)
+
+
+def similar_tasks(task, k: int = DEFAULT_TOP_K) -> list:
+    """
+    Returns:
+        list: Up to k (task_id, score) pairs most similar to the task.
+    """
+    index = get_index()
+    vector = index.vector(task.pk)
+    if vector is None:
+        vector = embed_task(task)
+    return index.search(vector, k, exclude=task.pk)
+
+
+def backfill_embeddings(batch_size: int = 1000) -> int:
+    """
+    Embeds every task and replaces the stored vectors.
+
+    Returns:
+        int: Number of tasks embedded.
+    """
+    count = 0
+    batch = []
+    tasks = Task.objects.only("id", "title", "description").order_by("pk")
+    for task in tasks.iterator(chunk_size=batch_size):
+        batch.append(TaskEmbedding(task_id=task.pk, vector=to_bytes(embed_task(task))))
+        if len(batch) == batch_size:
+            count += _write_embeddings(batch)
+            batch = []
+    if batch:
+        count += _write_embeddings(batch)
+
+    reset_index()
+    return count
+
+
+def _write_embeddings(batch: list) -> int:
+    TaskEmbedding.objects.bulk_create(
+        batch,
+        update_conflicts=True,
+        unique_fields=["task"],
+        update_fields=["vector"],
+    )
+    return len(batch)
@@ -0,0 +1,80 @@
+"""
+Incremental JSON rendering of list responses.
+
+StreamingListMixin replaces ModelViewSet.list for JSON clients: each item
+is serialized and encoded while earlier ones are already being sent, so a
+response never holds the whole rendered list in memory. The bytes match
+DRF's JSONRenderer output for the same data.
+"""
+
+import json
+
+from django.http import StreamingHttpResponse
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+
+STREAM_CHUNK_ITEMS = 50
+STREAM_QUERY_CHUNK_SIZE = 500
+
+
+def _dumps(data) -> str:
+    return json.dumps(
+        data,
+        cls=JSONEncoder,
+        ensure_ascii=not api_settings.UNICODE_JSON,
+        allow_nan=not api_settings.STRICT_JSON,
+        separators=(",", ":") if api_settings.COMPACT_JSON else (", ", ": "),
+    )
+
+
+def iter_json_array(items, to_representation):
+    """
+    Yields the represented items as one JSON array, STREAM_CHUNK_ITEMS
+    items per chunk.
+    """
+    chunk = ["["]
+    for position, item in enumerate(items):
+        chunk.append(("," if position else "") + _dumps(to_representation(item)))
+        if len(chunk) >= STREAM_CHUNK_ITEMS:
+            yield "".join(chunk).encode()
+            chunk = []
+    chunk.append("]")
+    yield "".join(chunk).encode()
+
+
+def iter_json_list(envelope: dict, items, to_representation, key: str = "results"):
+    """
+    Yields `envelope` as JSON with `key` set to the streamed item array.
+    """
+    head = _dumps({**envelope, key: []})
+    marker = head.rindex("[]")
+    yield head[:marker].encode()
+    yield from iter_json_array(items, to_representation)
+    yield head[marker + 2 :].encode()
+
+
+class StreamingListMixin:
+    """
+    Streams list responses to JSON clients. Paginated lists keep their
+    envelope; unpaginated lists read the queryset in chunks with
+    .iterator() instead of loading every row first. Other renderers
+    (e.g. the browsable API) use the regular list().
+    """
+
+    def list(self, request, *args, **kwargs):
+        renderer = getattr(request, "accepted_renderer", None)
+        if renderer is None or renderer.format != "json":
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        to_representation = self.get_serializer(many=True).child.to_representation
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            envelope = dict(self.get_paginated_response([]).data)
+            content = iter_json_list(envelope, page, to_representation)
+        else:
+            rows = queryset.iterator(chunk_size=STREAM_QUERY_CHUNK_SIZE)
+            content = iter_json_array(rows, to_representation)
+
+        return StreamingHttpResponse(content, content_type="application/json")
@@ -1,3 +1,888 @@
-"""Test cases for the health app."""
+"""Test cases for the api app."""
 
-# Unit tests will be added in future modules.
+import gzip
+import json
+import threading
+import time
+from unittest import mock, skipUnless
+
+import requests
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db.models import Count, Q
+from django.db.models.functions import TruncDate
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+from ai_engines import csv_analysis
+from ai_engines.sentiment import SentimentEngine
+
+from . import compression, inference_client, profiling, similarity
+from .models import (
+    CsvAnalysisResult,
+    Project,
+    ProjectActivity,
+    RequestProfile,
+    Task,
+    TaskEmbedding,
+)
+from .serializers import TaskSerializer
+
+
+def _csv_upload(content: bytes, name: str = "data.csv") -> SimpleUploadedFile:
+    return SimpleUploadedFile(name, content, content_type="text/csv")
+
+
+class CsvAnalysisCacheTests(TestCase):
+    """Fingerprinting and stored-result behaviour of /api/ai/csv/."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.credentials(HTTP_X_SERVICE_KEY=settings.DJANGO_SERVICE_KEY)
+        self.content = b"name,price\na,1\nb,3\n"
+
+    def test_repeat_upload_returns_stored_result(self):
+        first = self.client.post(
+            "/api/ai/csv/", {"file": _csv_upload(self.content)}, format="multipart"
+        )
+        second = self.client.post(
+            "/api/ai/csv/",
+            {"file": _csv_upload(self.content, "copy.csv")},
+            format="multipart",
+        )
+
+        self.assertEqual(first.status_code, 200)
+        self.assertFalse(first.data["cached"])
+        self.assertTrue(second.data["cached"])
+        self.assertEqual(first.data["analysisId"], second.data["analysisId"])
+        self.assertEqual(second.data["fileName"], "copy.csv")
+        self.assertEqual(second.data["numericSummary"]["price"]["avg"], 2.0)
+        self.assertEqual(CsvAnalysisResult.objects.count(), 1)
+
+    def test_known_fingerprint_skips_upload(self):
+        first = self.client.post(
+            "/api/ai/csv/", {"file": _csv_upload(self.content)}, format="multipart"
+        )
+        response = self.client.post(
+            "/api/ai/csv/",
+            {"fingerprint": first.data["fingerprint"]},
+            format="multipart",
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data["cached"])
+        self.assertEqual(response.data["rows"], 2)
+
+    def test_result_lookup_by_id(self):
+        first = self.client.post(
+            "/api/ai/csv/", {"file": _csv_upload(self.content)}, format="multipart"
+        )
+        response = self.client.get(f"/api/ai/csv/{first.data['analysisId']}/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["columnNames"], ["name", "price"])
+        self.assertEqual(self.client.get("/api/ai/csv/999/").status_code, 404)
+
+
+class CsvIncrementalAnalysisTests(TestCase):
+    """Merging appended rows into a stored result of /api/ai/csv/."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.credentials(HTTP_X_SERVICE_KEY=settings.DJANGO_SERVICE_KEY)
+
+    def _post(self, content: bytes, **extra):
+        return self.client.post(
+            "/api/ai/csv/", {"file": _csv_upload(content), **extra}, format="multipart"
+        )
+
+    def test_merged_result_matches_full_recomputation(self):
+        base = b"name,price,qty\na,1.5,2\nb,3,\nc,2,7\n"
+        delta = b"name,price,qty\nd,10,1\ne,-4,2\n"
+        full = base + delta.split(b"\n", 1)[1]
+
+        prior = self._post(base)
+        merged = self._post(delta, previousId=prior.data["analysisId"])
+        recomputed = self._post(full)
+
+        self.assertEqual(merged.status_code, 200)
+        self.assertFalse(merged.data["cached"])
+        self.assertEqual(merged.data["rows"], 5)
+        self.assertEqual(
+            merged.data["numericSummary"], recomputed.data["numericSummary"]
+        )
+
+    def test_known_fingerprint_with_previous_result(self):
+        base = b"name,price\na,1\nb,2\n"
+        delta = b"name,price\nc,3\n"
+
+        prior = self._post(base)
+        standalone = self._post(delta)
+        merged = self._post(
+            delta,
+            previousId=prior.data["analysisId"],
+            fingerprint=standalone.data["fingerprint"],
+        )
+        repeated = self._post(
+            delta,
+            previousId=prior.data["analysisId"],
+            fingerprint=standalone.data["fingerprint"],
+        )
+
+        self.assertEqual(merged.data["rows"], 3)
+        self.assertFalse(merged.data["cached"])
+        self.assertEqual(repeated.data["rows"], 3)
+        self.assertTrue(repeated.data["cached"])
+        self.assertEqual(repeated.data["analysisId"], merged.data["analysisId"])
+
+    def test_column_mismatch_is_rejected(self):
+        prior = self._post(b"a,b\n1,2\n")
+        response = self._post(b"a,c\n3,4\n", previousId=prior.data["analysisId"])
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_unknown_previous_result(self):
+        self.assertEqual(self._post(b"a\n1\n", previousId="42").status_code, 404)
+
+
+class CsvGroupedQueryTests(TestCase):
+    """Grouped aggregation queries sent to /api/ai/csv/."""
+
+    content = (
+        b"title,category,price,stock\n"
+        b"a,beauty,10,5\n"
+        b"b,beauty,30,50\n"
+        b"c,laptops,1000,20\n"
+        b"d,laptops,1500,40\n"
+        b"e,,7,60\n"
+    )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.credentials(HTTP_X_SERVICE_KEY=settings.DJANGO_SERVICE_KEY)
+
+    def _post(self, content: bytes, query: dict, **extra):
+        return self.client.post(
+            "/api/ai/csv/",
+            {"file": _csv_upload(content), "query": json.dumps(query), **extra},
+            format="multipart",
+        )
+
+    def test_group_by_with_filter_and_order(self):
+        query = {
+            "groupBy": ["category"],
+            "aggregations": [
+                {"op": "count"},
+                {"op": "mean", "column": "price"},
+                {"op": "argmax", "column": "price", "return": "title"},
+            ],
+            "filters": [{"column": "stock", "op": ">=", "value": 20}],
+            "orderBy": "-mean_price",
+        }
+        response = self._post(self.content, query)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["rows"], 5)
+        self.assertEqual(
+            response.data["groups"],
+            [
+                {
+                    "category": "laptops",
+                    "count": 2,
+                    "mean_price": 1250.0,
+                    "argmax_price": "d",
+                },
+                {
+                    "category": "beauty",
+                    "count": 1,
+                    "mean_price": 30.0,
+                    "argmax_price": "b",
+                },
+                {"category": None, "count": 1, "mean_price": 7.0, "argmax_price": "e"},
+            ],
+        )
+
+    def test_grouped_query_parses_upload_once(self):
+        query = {
+            "groupBy": "stock",
+            "aggregations": [{"op": "sum", "column": "price"}],
+        }
+        read_csv = mock.Mock(wraps=csv_analysis.pd.read_csv)
+        with mock.patch.object(csv_analysis.pd, "read_csv", read_csv):
+            response = self._post(self.content, query)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(read_csv.call_count, 1)
+        # Group keys are read as text, but still summarised as numbers.
+        self.assertEqual(
+            response.data["groups"][0], {"stock": "20", "sum_price": 1000.0}
+        )
+        self.assertEqual(response.data["numericSummary"]["stock"]["avg"], 35.0)
+
+    def test_grouped_result_merges_appended_rows(self):
+        query = {
+            "groupBy": "category",
+            "aggregations": [
+                {"op": "std", "column": "price"},
+                {"op": "argmin", "column": "price", "return": "title"},
+            ],
+        }
+        lines = self.content.splitlines(keepends=True)
+        base = b"".join(lines[:4])
+        delta = lines[0] + b"".join(lines[4:])
+
+        prior = self._post(base, query)
+        merged = self._post(delta, query, previousId=prior.data["analysisId"])
+        full = self._post(self.content, query)
+
+        self.assertEqual(merged.status_code, 200)
+        self.assertEqual(merged.data["groups"], full.data["groups"])
+
+    def test_invalid_query(self):
+        bad_op = self._post(
+            self.content,
+            {
+                "groupBy": "category",
+                "aggregations": [{"op": "median", "column": "price"}],
+            },
+        )
+        unknown = self._post(self.content, {"groupBy": "missing"})
+
+        self.assertEqual(bad_op.status_code, 400)
+        self.assertEqual(unknown.status_code, 400)
+
+
+class SentimentEngineTests(TestCase):
+    """SentimentEngine must score exactly like plain VADER."""
+
+    corpus = [
+        "Task done, thanks!",
+        "This is NOT acceptable, the build is broken!!!",
+        "Great work on the release 🎉",
+        "The fix was kind of okay but the tests are still failing",
+        "Never so happy to close a ticket",
+        "At least it isn't a horrible bug.",
+        "no  problems,\tno worries :)",
+        "VADER is VERY SMART, uber handsome, and FRIGGIN FUNNY!!!",
+        "",
+    ]
+
+    def test_scores_match_vader(self):
+        vader = SentimentIntensityAnalyzer()
+        engine = SentimentEngine()
+
+        for text in self.corpus + self.corpus:
+            self.assertEqual(engine.polarity_scores(text), vader.polarity_scores(text))
+        self.assertEqual(engine.cache_info().hits, len(self.corpus))
+
+
+@override_settings(INFERENCE_SERVICE_URL="http://inference.local")
+class InferenceProxyTests(TestCase):
+    """AI endpoints forward model work when an inference service is set."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.credentials(HTTP_X_SERVICE_KEY=settings.DJANGO_SERVICE_KEY)
+
+    def test_sentiment_is_proxied(self):
+        with mock.patch.object(
+            inference_client,
+            "post_json",
+            return_value=({"polarity": 0.9, "tone": "Positive"}, 200),
+        ) as post_json:
+            response = self.client.post(
+                "/api/ai/sentiment/", {"text": "Great!"}, format="json"
+            )
+
+        post_json.assert_called_once_with("api/ai/sentiment/", {"text": "Great!"})
+        self.assertEqual(response.data, {"polarity": 0.9, "tone": "Positive"})
+
+    def test_csv_state_from_service_is_stored(self):
+        state = {
+            "rows": 1,
+            "columnNames": ["a"],
+            "numeric": {},
+            "nonNumeric": ["a"],
+        }
+        with mock.patch.object(
+            inference_client, "analyze_csv", return_value=({"state": state}, 200)
+        ):
+            response = self.client.post(
+                "/api/ai/csv/", {"file": _csv_upload(b"a\nx\n")}, format="multipart"
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["rows"], 1)
+        self.assertEqual(CsvAnalysisResult.objects.get().state, state)
+
+    def test_csv_upload_is_streamed_to_service(self):
+        upload = _csv_upload(b"a\n1\n2\n")
+        with override_settings(INFERENCE_SERVICE_URL="http://inference.local"):
+            with mock.patch.object(
+                inference_client.get_session(),
+                "post",
+                return_value=mock.Mock(status_code=200, json=lambda: {}),
+            ) as post:
+                inference_client.analyze_csv(upload, None)
+
+        url, kwargs = post.call_args.args[0], post.call_args.kwargs
+        kwargs.pop("timeout")
+        with mock.patch.object(upload.file, "read", wraps=upload.file.read) as read:
+            prepared = requests.Request("POST", url, **kwargs).prepare()
+
+        # The upload itself is the body (sent in blocks), not a copy of it.
+        read.assert_not_called()
+        self.assertIs(prepared.body, upload)
+        self.assertEqual(prepared.headers["Content-Length"], str(upload.size))
+        self.assertTrue(url.endswith("/api/ai/csv/stream/"))
+
+    def test_unreachable_service(self):
+        with mock.patch.object(
+            inference_client.get_session(),
+            "post",
+            side_effect=requests.ConnectionError("refused"),
+        ):
+            response = self.client.post(
+                "/api/ai/summarize/", {"text": "Short note."}, format="json"
+            )
+
+        self.assertEqual(response.status_code, 503)
+
+
+class ExportTests(TestCase):
+    """Streaming CSV/NDJSON exports of /api/export/."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username="exporter"))
+        self.project = Project.objects.create(name="Alpha")
+        other = Project.objects.create(name="Beta")
+        Task.objects.create(project=self.project, title="Write, docs", done=True)
+        Task.objects.create(project=self.project, title="Ship", done=False)
+        Task.objects.create(project=other, title="Plan", done=True)
+
+    def _content(self, response) -> str:
+        return b"".join(response.streaming_content).decode()
+
+    def test_tasks_csv_with_filters(self):
+        response = self.client.get(
+            "/api/export/tasks/", {"project": self.project.id, "done": "true"}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        lines = self._content(response).splitlines()
+        self.assertEqual(lines[0], "id,project_id,title,description,done,created_at")
+        self.assertEqual(len(lines), 2)
+        self.assertIn('"Write, docs"', lines[1])
+
+    def test_rows_are_sent_in_chunks(self):
+        Task.objects.bulk_create(
+            Task(project=self.project, title=f"Task {i}") for i in range(3000)
+        )
+        response = self.client.get("/api/export/tasks/")
+        chunks = list(response.streaming_content)
+
+        self.assertEqual(
+            chunks[0], b"id,project_id,title,description,done,created_at\r\n"
+        )
+        self.assertLess(len(chunks), 10)
+        self.assertEqual(len(b"".join(chunks).decode().splitlines()), 3004)
+
+    def test_projects_ndjson(self):
+        response = self.client.get(
+            "/api/export/projects/",
+            {"output": "ndjson", "created_after": "2000-01-01"},
+        )
+
+        records = [json.loads(line) for line in self._content(response).splitlines()]
+        self.assertEqual([r["name"] for r in records], ["Alpha", "Beta"])
+
+    def test_invalid_filters(self):
+        for params in (
+            {"done": "maybe"},
+            {"created_before": "soon"},
+            {"output": "xml"},
+        ):
+            response = self.client.get("/api/export/tasks/", params)
+            self.assertEqual(response.status_code, 400)
+
+
+@override_settings(PROFILING_ENABLED=True, PROFILING_SAMPLE_RATE=0)
+class RequestProfilingTests(TestCase):
+    """Opt-in request profiles and their download endpoints."""
+
+    def setUp(self):
+        self.client = APIClient()
+        Project.objects.create(name="Alpha")
+
+    def test_header_requires_staff_or_service_key(self):
+        self.client.force_authenticate(User.objects.create(username="member"))
+        response = self.client.get("/api/projects/", HTTP_X_PROFILE="1")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("X-Profile-Id", response)
+        self.assertFalse(RequestProfile.objects.exists())
+
+    def test_staff_profile_and_download(self):
+        staff = User.objects.create(username="admin", is_staff=True)
+        self.client.force_authenticate(staff)
+
+        response = self.client.get("/api/projects/", HTTP_X_PROFILE="1")
+        b"".join(response.streaming_content)
+        profile = RequestProfile.objects.get(pk=response["X-Profile-Id"])
+
+        self.assertEqual(profile.view, "projects.list")
+        self.assertFalse(profile.sampled)
+        self.assertGreater(profile.query_count, 0)
+        self.assertTrue(any("api_project" in q["sql"] for q in profile.queries))
+
+        detail = self.client.get(f"/api/profiles/{profile.id}/")
+        self.assertEqual(detail.data["queryCount"], profile.query_count)
+        flamegraph = self.client.get(f"/api/profiles/{profile.id}/flamegraph/")
+        self.assertEqual(flamegraph["Content-Type"], "text/plain")
+
+    def test_streamed_list_uses_one_sampler(self):
+        Project.objects.bulk_create(Project(name=f"P{i}") for i in range(200))
+        self.client.force_authenticate(
+            User.objects.create(username="admin", is_staff=True)
+        )
+
+        with mock.patch.object(
+            profiling, "StackSampler", wraps=profiling.StackSampler
+        ) as sampler:
+            response = self.client.get("/api/projects/", HTTP_X_PROFILE="1")
+            chunks = list(response.streaming_content)
+
+        self.assertGreater(len(chunks), 4)
+        # One for the view call, one for the whole stream.
+        self.assertEqual(sampler.call_count, 2)
+        profile = RequestProfile.objects.get(pk=response["X-Profile-Id"])
+        self.assertTrue(any("api_project" in q["sql"] for q in profile.queries))
+
+    @override_settings(PROFILING_SAMPLE_RATE=1.0, PROFILING_MAX_PROFILES=2)
+    def test_only_newest_profiles_are_kept(self):
+        self.client.force_authenticate(User.objects.create(username="member"))
+        ids = [int(self.client.get("/api/projects/")["X-Profile-Id"]) for _ in range(3)]
+
+        self.assertEqual(
+            list(RequestProfile.objects.order_by("id").values_list("id", flat=True)),
+            ids[1:],
+        )
+
+    @override_settings(PROFILING_SAMPLE_RATE=1.0)
+    def test_sampled_summarize_request(self):
+        response = self.client.post(
+            "/api/ai/summarize/",
+            {"text": "Short note."},
+            format="json",
+            HTTP_X_SERVICE_KEY=settings.DJANGO_SERVICE_KEY,
+        )
+
+        profile = RequestProfile.objects.get(pk=response["X-Profile-Id"])
+        self.assertTrue(profile.sampled)
+        self.assertEqual(profile.view, "ai.summarize")
+        self.assertEqual(self.client.get("/api/profiles/").status_code, 401)
+
+
+class ProjectActivityTests(TestCase):
+    """Daily activity rollup behind /api/projects/<id>/stats/."""
+
+    def setUp(self):
+        self.alpha = Project.objects.create(name="Alpha")
+        self.beta = Project.objects.create(name="Beta")
+
+    def _rollup(self) -> set:
+        return set(
+            ProjectActivity.objects.exclude(created=0, done=0).values_list(
+                "project_id", "day", "created", "done"
+            )
+        )
+
+    def _scan(self) -> set:
+        rows = (
+            Task.objects.annotate(day=TruncDate("created_at"))
+            .values("project_id", "day")
+            .annotate(created=Count("id"), done=Count("id", filter=Q(done=True)))
+        )
+        return {(r["project_id"], r["day"], r["created"], r["done"]) for r in rows}
+
+    def test_counters_follow_task_changes(self):
+        first = Task.objects.create(project=self.alpha, title="One")
+        second = Task.objects.create(project=self.alpha, title="Two", done=True)
+        Task.objects.create(project=self.beta, title="Three")
+        self.assertEqual(self._rollup(), self._scan())
+
+        first.done = True
+        first.save()
+        second.project = self.beta
+        second.save()
+        self.assertEqual(self._rollup(), self._scan())
+
+        first.delete()
+        self.assertEqual(self._rollup(), self._scan())
+
+    def test_save_and_counters_commit_together(self):
+        task = Task.objects.create(project=self.alpha, title="One")
+        task.done = True
+
+        with mock.patch("api.signals.apply_change", side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                task.save()
+
+        task.refresh_from_db()
+        self.assertFalse(task.done)
+        self.assertEqual(self._rollup(), self._scan())
+
+    def test_backfill_and_stats(self):
+        Task.objects.create(project=self.alpha, title="One", done=True)
+        Task.objects.create(project=self.alpha, title="Two")
+        ProjectActivity.objects.all().delete()
+
+        call_command("backfill_project_activity", stdout=mock.MagicMock())
+        self.assertEqual(self._rollup(), self._scan())
+
+        client = APIClient()
+        client.force_authenticate(User.objects.create(username="viewer"))
+        response = client.get(f"/api/projects/{self.alpha.id}/stats/")
+
+        self.assertEqual(response.data["totals"], {"created": 2, "done": 1})
+        self.assertEqual(len(response.data["days"]), 1)
+        self.assertEqual(client.get("/api/projects/999/stats/").status_code, 404)
+
+
+class TaskSimilarityTests(TestCase):
+    """Task embeddings, similarity search and the duplicate report."""
+
+    def setUp(self):
+        similarity.reset_index()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username="triager"))
+        project = Project.objects.create(name="Alpha")
+        self.login = Task.objects.create(
+            project=project, title="Fix login page crash on Safari"
+        )
+        self.duplicate = Task.objects.create(
+            project=project,
+            title="Login page crash on Safari",
+            description="Fix it",
+        )
+        self.other = Task.objects.create(project=project, title="Write release notes")
+
+    def test_embedding_follows_text_changes(self):
+        stored = TaskEmbedding.objects.get(pk=self.other.pk).vector
+        self.other.done = True
+        self.other.save()
+        self.assertEqual(TaskEmbedding.objects.get(pk=self.other.pk).vector, stored)
+
+        self.other.title = "Update release notes"
+        self.other.save()
+        self.assertNotEqual(TaskEmbedding.objects.get(pk=self.other.pk).vector, stored)
+
+    def test_similar_tasks(self):
+        response = self.client.get(f"/api/tasks/{self.login.id}/similar/", {"k": 2})
+
+        results = response.data["results"]
+        self.assertEqual(results[0]["id"], self.duplicate.id)
+        self.assertGreater(results[0]["score"], results[1]["score"])
+        self.assertNotIn(self.login.id, [r["id"] for r in results])
+
+        self.duplicate.delete()
+        response = self.client.get(f"/api/tasks/{self.login.id}/similar/")
+        self.assertEqual([r["id"] for r in response.data["results"]], [self.other.id])
+
+    def test_dedup_report(self):
+        response = self.client.get("/api/tasks/dedup/", {"threshold": "0.5"})
+
+        pairs = [(p["task"], p["duplicate"]) for p in response.data["pairs"]]
+        self.assertEqual(pairs, [(self.login.id, self.duplicate.id)])
+        self.assertEqual(
+            self.client.get("/api/tasks/dedup/", {"threshold": "2"}).status_code, 400
+        )
+
+    def test_dedup_report_pages_queried_tasks(self):
+        pages = []
+        params = {"threshold": "0.5"}
+        with mock.patch.object(similarity, "MAX_DEDUP_QUERIES", 2):
+            while True:
+                data = self.client.get("/api/tasks/dedup/", params).data
+                pages.append([(p["task"], p["duplicate"]) for p in data["pairs"]])
+                if data["next"] is None:
+                    break
+                params["after"] = data["next"]
+
+        pair = (self.login.id, self.duplicate.id)
+        self.assertEqual(pages, [[pair], []])
+
+    def test_dedup_scores_outside_index_lock(self):
+        index = similarity.get_index()
+        scored = []
+
+        def cosine_scores(*args):
+            scored.append(index._lock.locked())
+            return original(*args)
+
+        original = similarity._cosine_scores
+        with mock.patch.object(similarity, "_cosine_scores", cosine_scores):
+            pairs = index.duplicates(index.task_ids(), 2, 0.5)
+
+        self.assertEqual(pairs[0][:2], (self.login.id, self.duplicate.id))
+        self.assertEqual(scored, [False])
+
+    def test_weights_refresh_outside_index_lock(self):
+        vectors = {
+            task.id: similarity.embed_task(task)
+            for task in (self.login, self.duplicate, self.other)
+        }
+        index = similarity.VectorIndex(ann_min_size=1)
+        for task_id, vector in list(vectors.items())[:2]:
+            index.upsert(task_id, vector)
+        build = similarity.LshTables.build
+
+        def build_and_write(lsh, matrix):
+            # Would deadlock if the refresh held the lock.
+            index.upsert(self.other.id, vectors[self.other.id])
+            build(lsh, matrix)
+
+        with mock.patch.object(similarity.LshTables, "build", build_and_write):
+            index.refresh_weights()
+
+        [(task_id, score)] = index.search(vectors[self.other.id], 1)
+        self.assertEqual((task_id, score), (self.other.id, 1.0))
+        self.assertFalse(similarity.get_index()._weights_stale())
+
+    def test_stale_index_rebuilt_in_background(self):
+        stale = similarity.get_index()
+        stale.loaded_at -= similarity.INDEX_MAX_AGE + 1
+        rebuilt = similarity.VectorIndex()
+        release = threading.Event()
+
+        def load_index():
+            release.wait(5)
+            return rebuilt
+
+        with mock.patch.object(similarity, "load_index", load_index):
+            self.assertIs(similarity.get_index(), stale)
+            task = Task.objects.create(
+                project=self.other.project, title="Saved during the rebuild"
+            )
+            release.set()
+            for _ in range(500):
+                if similarity.get_index() is rebuilt:
+                    break
+                time.sleep(0.01)
+
+        self.assertIs(similarity.get_index(), rebuilt)
+        self.assertIn(task.id, rebuilt)
+        self.assertIn(task.id, stale)
+
+    def test_approximate_index_matches_exact(self):
+        vectors = {
+            task.id: similarity.embed_task(task)
+            for task in (self.login, self.duplicate, self.other)
+        }
+        exact = similarity.VectorIndex()
+        approximate = similarity.VectorIndex(ann_min_size=1)
+        for task_id, vector in vectors.items():
+            exact.upsert(task_id, vector)
+            approximate.upsert(task_id, vector)
+
+        query = vectors[self.login.id]
+        self.assertEqual(
+            approximate.search(query, 1, exclude=self.login.id),
+            exact.search(query, 1, exclude=self.login.id),
+        )
+        self.assertEqual(
+            approximate.duplicates(list(vectors), 2, 0.5),
+            exact.duplicates(list(vectors), 2, 0.5),
+        )
+        self.assertTrue(approximate.approximate)
+        self.assertFalse(exact.approximate)
+
+
+class ResponseStreamingTests(TestCase):
+    """Streamed JSON lists and negotiated response compression."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username="reader"))
+        project = Project.objects.create(name="Alpha")
+        for i in range(120):
+            Task.objects.create(project=project, title=f"Task {i}", description="ü")
+
+    def test_list_is_streamed_like_json_renderer(self):
+        response = self.client.get("/api/tasks/")
+
+        self.assertTrue(response.streaming)
+        tasks = Task.objects.order_by("-created_at")
+        self.assertEqual(
+            b"".join(response.streaming_content),
+            JSONRenderer().render(TaskSerializer(tasks, many=True).data),
+        )
+
+    def test_paginated_list_keeps_envelope(self):
+        with mock.patch.object(PageNumberPagination, "page_size", 100):
+            response = self.client.get("/api/tasks/", {"page": 2})
+
+        tasks = Task.objects.order_by("-created_at")[100:]
+        expected = {
+            "count": 120,
+            "next": None,
+            "previous": "http://testserver/api/tasks/",
+            "results": TaskSerializer(tasks, many=True).data,
+        }
+        self.assertEqual(
+            b"".join(response.streaming_content), JSONRenderer().render(expected)
+        )
+
+    def test_negotiated_compression(self):
+        response = self.client.get("/api/tasks/", HTTP_ACCEPT_ENCODING="br;q=0, gzip")
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response["Vary"])
+        body = gzip.decompress(b"".join(response.streaming_content))
+        self.assertEqual(len(json.loads(body)), 120)
+
+        refused = self.client.get("/api/tasks/", HTTP_ACCEPT_ENCODING="*;q=0")
+        self.assertFalse(refused.has_header("Content-Encoding"))
+
+    @skipUnless(compression.brotli, "brotli is not installed")
+    def test_negotiated_brotli(self):
+        response = self.client.get("/api/tasks/", HTTP_ACCEPT_ENCODING="gzip, br")
+
+        self.assertEqual(response["Content-Encoding"], "br")
+        body = compression.brotli.decompress(b"".join(response.streaming_content))
+        self.assertEqual(len(json.loads(body)), 120)
+
+    @skipUnless(compression.zstandard, "zstandard is not installed")
+    def test_negotiated_zstd(self):
+        response = self.client.get(
+            "/api/tasks/", HTTP_ACCEPT_ENCODING="gzip, br;q=0.9, zstd"
+        )
+
+        self.assertEqual(response["Content-Encoding"], "zstd")
+        reader = compression.zstandard.ZstdDecompressor().stream_reader(
+            b"".join(response.streaming_content)
+        )
+        self.assertEqual(len(json.loads(reader.read())), 120)
+
+    def test_stream_flushes_in_blocks(self):
+        rows = [f"{i},Task {i},true\n".encode() for i in range(20_000)]
+        parts = list(compression.compress_stream(rows, "gzip"))
+
+        self.assertEqual(gzip.decompress(b"".join(parts)), b"".join(rows))
+        self.assertLess(len(parts), len(rows) // 100)
+        whole = compression.compress_bytes(b"".join(rows), "gzip")
+        self.assertLess(len(b"".join(parts)), len(whole) * 1.1)
+
+    def test_html_pages_are_not_compressed(self):
+        response = self.client.get("/admin/login/", HTTP_ACCEPT_ENCODING="gzip")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "csrfmiddlewaretoken")
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+    @override_settings(COMPRESSION_MIN_SIZE=10_000)
+    def test_small_responses_are_not_compressed(self):
+        project = Project.objects.get()
+        response = self.client.get(
+            f"/api/projects/{project.id}/stats/", HTTP_ACCEPT_ENCODING="gzip"
+        )
+
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertEqual(response.data["totals"]["created"], 120)
+
+
+class BulkRegisterTests(TestCase):
+    """Admin-only bulk registration at /api/auth/register/bulk/."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            User.objects.create(username="admin", is_staff=True)
+        )
+        User.objects.create(username="taken")
+
+    def test_reports_each_user(self):
+        response = self.client.post(
+            "/api/auth/register/bulk/",
+            {
+                "users": [
+                    {"username": "ana", "password": "pw-ana", "email": "a@x.io"},
+                    {"username": "taken", "password": "pw"},
+                    {"username": "ana", "password": "other"},
+                    {"username": "ivo"},
+                    {"username": "marko", "password": "pw-marko"},
+                ]
+            },
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["created"], 2)
+        self.assertEqual(
+            [r["status"] for r in response.data["results"]],
+            ["created", "exists", "duplicate", "invalid", "created"],
+        )
+        ana = User.objects.get(username="ana")
+        self.assertEqual(response.data["results"][0]["id"], ana.id)
+        self.assertTrue(ana.check_password("pw-ana"))
+        self.assertTrue(User.objects.get(username="marko").check_password("pw-marko"))
+
+    def test_invalid_entries_are_reported(self):
+        response = self.client.post(
+            "/api/auth/register/bulk/",
+            {
+                "users": [
+                    {"username": "x" * 151, "password": "pw"},
+                    {"username": "bad name!", "password": "pw"},
+                    {"username": "mia", "password": "pw", "email": "not-an-email"},
+                    {"username": "lea", "password": "pw", "email": "l@x.io"},
+                ]
+            },
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 201)
+        results = response.data["results"]
+        self.assertEqual(
+            [r["status"] for r in results], ["invalid", "invalid", "invalid", "created"]
+        )
+        self.assertIn("at most 150 characters", results[0]["error"])
+        self.assertIn("valid username", results[1]["error"])
+        self.assertIn("valid email", results[2]["error"])
+        self.assertEqual(
+            list(
+                User.objects.filter(username__in=["mia", "lea"]).values_list(
+                    "username", flat=True
+                )
+            ),
+            ["lea"],
+        )
+
+    @override_settings(BULK_REGISTER_MAX_USERS=2)
+    def test_request_size_is_capped(self):
+        users = [{"username": f"u{i}", "password": "pw"} for i in range(3)]
+        response = self.client.post(
+            "/api/auth/register/bulk/", {"users": users}, format="json"
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["error"], "At most 2 users per request")
+        self.assertFalse(User.objects.filter(username="u0").exists())
+
+    def test_admin_only(self):
+        self.client.force_authenticate(User.objects.create(username="member"))
+        response = self.client.post(
+            "/api/auth/register/bulk/",
+            {"users": [{"username": "x", "password": "y"}]},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(User.objects.filter(username="x").exists())
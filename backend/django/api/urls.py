@@ -3,8 +3,10 @@ API routing configuration for the Django REST API.
 
 Includes:
     - CRUD routes for Project and Task viewsets
-    - Authentication endpoints (register, login, refresh)
-    - AI endpoints (/api/ai/summarize, sentiment)
+    - Authentication endpoints (register, bulk register, login, refresh)
+    - AI endpoints (/api/ai/summarize, sentiment, csv)
+    - Bulk export endpoints (/api/export/tasks, projects)
+    - Request profile downloads (/api/profiles)
 """
 
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
@@ -14,9 +16,16 @@ from .views import (
     ProjectViewSet,
     TaskViewSet,
     RegisterView,
+    BulkRegisterView,
     summarize_view,
     sentiment_view,
     csv_analysis_view,
+    csv_result_view,
+    export_tasks_view,
+    export_projects_view,
+    profile_list_view,
+    profile_view,
+    profile_flamegraph_view,
 )
 
 router = DefaultRouter()
@@ -26,9 +35,20 @@ router.register(r"tasks", TaskViewSet)
 urlpatterns = [
     path("", include(router.urls)),
     path("auth/register/", RegisterView.as_view(), name="register"),
+    path("auth/register/bulk/", BulkRegisterView.as_view(), name="register_bulk"),
     path("auth/login/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
     path("auth/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
     path("ai/summarize/", summarize_view, name="ai_summarize"),
     path("ai/sentiment/", sentiment_view, name="ai_sentiment"),
     path("ai/csv/", csv_analysis_view, name="ai_csv"),
+    path("ai/csv/<int:pk>/", csv_result_view, name="ai_csv_result"),
+    path("export/tasks/", export_tasks_view, name="export_tasks"),
+    path("export/projects/", export_projects_view, name="export_projects"),
+    path("profiles/", profile_list_view, name="profiles"),
+    path("profiles/<int:pk>/", profile_view, name="profile"),
+    path(
+        "profiles/<int:pk>/flamegraph/",
+        profile_flamegraph_view,
+        name="profile_flamegraph",
+    ),
 ]
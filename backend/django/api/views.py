@@ -4,49 +4,71 @@ and AI endpoints for text summarization and sentiment analysis.
 
 Modules:
     - RegisterView: Handles user registration.
-    - ProjectViewSet / TaskViewSet: Provide CRUD endpoints.
+    - BulkRegisterView: Admin-only registration of many users at once.
+    - ProjectViewSet / TaskViewSet: Provide CRUD endpoints (lists are
+      streamed as JSON), plus daily project stats from the activity rollup
+      and task similarity search.
     - summarize_view: Text summarization (extractive + abstractive).
     - sentiment_view: VADER sentiment analysis.
+    - csv_analysis_view / csv_result_view: CSV analysis with stored results.
+    - export_tasks_view / export_projects_view: Streaming CSV/NDJSON export.
+    - profile_list_view / profile_view / profile_flamegraph_view: Stored
+      request profiles.
 """
 
 import logging
-import re
-from typing import List
-
-import pandas as pd
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 
 from django.conf import settings
 from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.http import HttpResponse
+from django.utils.dateparse import parse_date
 
 from rest_framework import status, viewsets
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.pagination import PageNumberPagination
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from .models import Project, Task
+from ai_engines.csv_analysis import (
+    chain_fingerprint,
+    compute_state,
+    fingerprint_upload,
+    merge_states,
+    options_key,
+    summarize_state,
+)
+from ai_engines.csv_query import (
+    QueryError,
+    compute_state_with_query,
+    merge_group_states,
+    parse_query,
+    summarize_groups,
+)
+from ai_engines.sentiment import SentimentEngine, sentiment_payload
+from ai_engines.summarization import MAX_INPUT_CHARS, summarize_text, summary_payload
+
+from . import activity, inference_client, similarity
+from .exports import (
+    EXPORT_FORMATS,
+    PROJECT_FIELDS,
+    TASK_FIELDS,
+    filter_created,
+    filter_tasks,
+    stream_export,
+)
+from .models import CsvAnalysisResult, Project, RequestProfile, Task
+from .passwords import hash_passwords
+from .profiling import is_profiler, profiled
 from .serializers import ProjectSerializer, TaskSerializer
+from .streaming import StreamingListMixin
 
 logger = logging.getLogger(__name__)
 
-_summarizer = None
-analyzer = SentimentIntensityAnalyzer()
-
-MAX_INPUT_CHARS = 1000
-SENTIMENT_NEUTRAL_THRESHOLD = 0.25
-
-
-def get_summarizer():
-    """Lazy-load BART summarization model."""
-    global _summarizer
-    if _summarizer is None:
-        from transformers import pipeline
-
-        _summarizer = pipeline("summarization", model="facebook/bart-large-cnn")
-    return _summarizer
+analyzer = SentimentEngine()
 
 
 class RegisterView(APIView):
@@ -80,55 +102,255 @@ class RegisterView(APIView):
         )
 
 
-class ProjectViewSet(viewsets.ModelViewSet):
+def _bulk_entry_error(username: str, email) -> str | None:
+    """
+    Runs the User field validators that bulk_create() skips.
+
+    Returns:
+        str | None: The validation message, or None for a valid entry.
+    """
+    try:
+        User._meta.get_field("username").run_validators(username)
+        if email:
+            if not isinstance(email, str):
+                raise ValidationError("Enter a valid email address.")
+            User._meta.get_field("email").run_validators(email)
+    except ValidationError as e:
+        return " ".join(e.messages)
+    return None
+
+
+class BulkRegisterView(APIView):
+    """
+    Admin-only bulk registration (POST /api/auth/register/bulk/).
+
+    Body: {"users": [{"username", "password", "email"?}, ...]}, at most
+    settings.BULK_REGISTER_MAX_USERS entries (sized to the hashing work).
+    Existing usernames are found with one query, passwords are hashed in a
+    process pool and all new users are inserted in one transaction.
+    Each entry is reported as created, exists, duplicate or invalid (with
+    the username/email validation message).
+    """
+
+    permission_classes = [IsAdminUser]
+
+    def post(self, request):
+        entries = request.data.get("users")
+        if not isinstance(entries, list) or not entries:
+            return Response({"error": "users must be a non-empty list"}, status=400)
+
+        max_users = settings.BULK_REGISTER_MAX_USERS
+        if len(entries) > max_users:
+            return Response(
+                {"error": f"At most {max_users} users per request"}, status=400
+            )
+
+        results = []
+        pending = {}
+        for entry in entries:
+            entry = entry if isinstance(entry, dict) else {}
+            username = str(entry.get("username") or "").strip()
+            password = entry.get("password")
+            error = (
+                "Username and password required"
+                if not username or not password
+                else _bulk_entry_error(username, entry.get("email"))
+            )
+
+            if error:
+                results.append(
+                    {"username": username, "status": "invalid", "error": error}
+                )
+            elif username in pending:
+                results.append({"username": username, "status": "duplicate"})
+            else:
+                pending[username] = entry
+                results.append({"username": username, "status": "created"})
+
+        existing = set(
+            User.objects.filter(username__in=list(pending)).values_list(
+                "username", flat=True
+            )
+        )
+        new = [name for name in pending if name not in existing]
+        hashes = hash_passwords([str(pending[name]["password"]) for name in new])
+        users = [
+            User(
+                username=name,
+                email=pending[name].get("email") or "",
+                password=password_hash,
+            )
+            for name, password_hash in zip(new, hashes)
+        ]
+
+        try:
+            with transaction.atomic():
+                created = User.objects.bulk_create(users)
+        except IntegrityError:
+            return Response(
+                {"error": "Some users were registered concurrently, retry"},
+                status=409,
+            )
+
+        ids = {user.username: user.id for user in created}
+        for result in results:
+            if result["status"] != "created":
+                continue
+            if result["username"] in existing:
+                result["status"] = "exists"
+            else:
+                result["id"] = ids[result["username"]]
+
+        return Response(
+            {"created": len(created), "results": results},
+            status=status.HTTP_201_CREATED if created else 200,
+        )
+
+
+class ProjectViewSet(StreamingListMixin, viewsets.ModelViewSet):
     queryset = Project.objects.prefetch_related("tasks").order_by("-created_at")
     serializer_class = ProjectSerializer
     permission_classes = [IsAuthenticated]
     pagination_class = PageNumberPagination
 
+    @profiled("projects.list")
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @action(detail=True, methods=["get"])
+    def stats(self, request, pk=None):
+        """
+        Daily created/done task counters (GET /api/projects/<id>/stats/),
+        read from the ProjectActivity rollup.
+        Optional "since" and "until" filters (ISO dates).
+        """
+        if not str(pk).isdigit() or not Project.objects.filter(pk=pk).exists():
+            return Response({"error": "Project not found"}, status=404)
+
+        bounds = {}
+        for name in ("since", "until"):
+            value = request.query_params.get(name)
+            if value:
+                try:
+                    bounds[name] = parse_date(value)
+                except ValueError:
+                    bounds[name] = None
+                if bounds[name] is None:
+                    return Response({"error": f"Invalid {name} date"}, status=400)
+
+        return Response(activity.stats(int(pk), **bounds), status=200)
+
+
+def _top_k_param(request) -> int:
+    """
+    Raises:
+        ValueError: If "k" is not an integer between 1 and MAX_TOP_K.
+    """
+    raw = request.query_params.get("k") or str(similarity.DEFAULT_TOP_K)
+    if not raw.isdigit() or not 1 <= int(raw) <= similarity.MAX_TOP_K:
+        raise ValueError(f"k must be an integer between 1 and {similarity.MAX_TOP_K}")
+    return int(raw)
+
+
+def _task_titles(task_ids) -> dict:
+    return dict(Task.objects.filter(pk__in=set(task_ids)).values_list("id", "title"))
 
-class TaskViewSet(viewsets.ModelViewSet):
+
+class TaskViewSet(StreamingListMixin, viewsets.ModelViewSet):
     queryset = Task.objects.all().order_by("-created_at")
     serializer_class = TaskSerializer
     permission_classes = [IsAuthenticated]
     pagination_class = PageNumberPagination
 
+    @action(detail=True, methods=["get"])
+    def similar(self, request, pk=None):
+        """
+        Most similar tasks by title and description
+        (GET /api/tasks/<id>/similar/?k=10).
+        """
+        task = Task.objects.filter(pk=pk).first() if str(pk).isdigit() else None
+        if task is None:
+            return Response({"error": "Task not found"}, status=404)
+
+        try:
+            k = _top_k_param(request)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+
+        matches = similarity.similar_tasks(task, k)
+        titles = _task_titles(task_id for task_id, _ in matches)
+        results = [
+            {"id": task_id, "title": titles[task_id], "score": score}
+            for task_id, score in matches
+            if task_id in titles
+        ]
+        return Response({"task": task.id, "results": results}, status=200)
+
+    @action(detail=False, methods=["get"])
+    def dedup(self, request):
+        """
+        Likely duplicate task pairs (GET /api/tasks/dedup/).
+
+        - Optional "project" limits the queried tasks to one project
+        - Optional "threshold" (0-1, default 0.8) and "k" neighbours per task
+        - At most MAX_DEDUP_QUERIES tasks are queried per request, in id
+          order; pass the returned "next" as "after" for the following ones
+        """
+        project = request.query_params.get("project")
+        after = request.query_params.get("after") or "0"
+        try:
+            k = _top_k_param(request)
+            threshold = float(
+                request.query_params.get("threshold") or similarity.DEDUP_THRESHOLD
+            )
+            if not 0 <= threshold <= 1:
+                raise ValueError("threshold must be between 0 and 1")
+            if project and not project.isdigit():
+                raise ValueError("project must be an integer")
+            if not after.isdigit():
+                raise ValueError("after must be an integer")
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+
+        index = similarity.get_index()
+        if project:
+            task_ids = Task.objects.filter(project_id=int(project)).values_list(
+                "id", flat=True
+            )
+        else:
+            task_ids = index.task_ids()
 
-def _split_sentences(text: str) -> List[str]:
-    """
-    Splits a block of text into a list of sentences using punctuation (.!?).
-    """
-    parts = re.split(r"(?<=[.!?])\s+", text.strip())
-    return [p.strip() for p in parts if p.strip()]
+        task_ids = sorted(task_id for task_id in task_ids if task_id > int(after))
+        queried = task_ids[: similarity.MAX_DEDUP_QUERIES]
+        more = len(task_ids) > len(queried)
 
+        pairs = index.duplicates(queried, k, threshold)
+        truncated = len(pairs) > similarity.MAX_DEDUP_PAIRS
+        pairs = pairs[: similarity.MAX_DEDUP_PAIRS]
+        titles = _task_titles(task_id for pair in pairs for task_id in pair[:2])
 
-def _smart_extractive_summary(text: str, max_sentences: int = 2) -> str:
-    """
-    Basic extractive summarization for medium-length text.
-    """
-    sentences = _split_sentences(text)
-    if len(sentences) <= max_sentences:
-        return text
-
-    scored = []
-    for idx, sentence in enumerate(sentences):
-        score = 0
-        if idx == 0:
-            score += 3
-        if idx == len(sentences) - 1:
-            score += 1
-        wc = len(sentence.split())
-        if 10 <= wc <= 25:
-            score += 2
-        scored.append((score, sentence))
-
-    scored.sort(reverse=True, key=lambda x: x[0])
-    selected = [s[1] for s in scored[:max_sentences]]
-    return " ".join(s for s in sentences if s in selected)
+        return Response(
+            {
+                "threshold": threshold,
+                "truncated": truncated,
+                "next": queried[-1] if more else None,
+                "pairs": [
+                    {
+                        "task": a,
+                        "duplicate": b,
+                        "score": score,
+                        "titles": [titles.get(a), titles.get(b)],
+                    }
+                    for a, b, score in pairs
+                ],
+            },
+            status=200,
+        )
 
 
 @api_view(["POST"])
 @permission_classes([AllowAny])
+@profiled("ai.summarize")
 def summarize_view(request):
     """
     AI Summarization endpoint (POST /api/ai/summarize/).
@@ -151,50 +373,20 @@ def summarize_view(request):
             status=400,
         )
 
-    try:
-        word_count = len(text.split())
-
-        if word_count < 30:
-            summary = text
-            strategy = "original-too-short"
-
-        elif word_count < 70:
-            summary = _smart_extractive_summary(text, max_sentences=2)
-            strategy = "extractive-smart"
-
-        else:
-            summarizer = get_summarizer()
-            input_len = word_count
-            max_len = min(int(input_len * 0.6), 130)
-            min_len = min(int(input_len * 0.3), 40)
-
-            result = summarizer(
-                text,
-                max_length=max_len,
-                min_length=min_len,
-                do_sample=False,
-                truncation=True,
-                num_beams=4,
-                length_penalty=1.0,
-                early_stopping=True,
-            )
-            summary = result[0]["summary_text"].strip()
-            strategy = "bart-abstractive"
+    if inference_client.is_enabled():
+        payload, status_code = inference_client.post_json(
+            "api/ai/summarize/", {"text": text}
+        )
+        return Response(payload, status=status_code)
 
+    try:
+        summary, strategy, word_count = summarize_text(text)
     except RuntimeError as e:
         logger.error(f"Summarization model error: {e}")
         return Response({"error": "Model error"}, status=500)
 
     return Response(
-        {
-            "original": text,
-            "summary": summary,
-            "meta": {
-                "strategy": strategy,
-                "original_words": word_count,
-                "summary_words": len(summary.split()),
-            },
-        },
+        summary_payload(text, summary, strategy, word_count),
         status=200,
     )
 
@@ -204,7 +396,7 @@ def summarize_view(request):
 def sentiment_view(request):
     """
     AI Sentiment Analysis endpoint (POST /api/ai/sentiment/).
-    Uses VADER and a ±0.25 neutral threshold.
+    Uses VADER (through the cached SentimentEngine) and a ±0.25 neutral threshold.
     Requires X-Service-Key.
     """
     service_key = request.headers.get("X-Service-Key")
@@ -218,23 +410,37 @@ def sentiment_view(request):
     if not text:
         return Response({"error": "Text is required"}, status=400)
 
+    if inference_client.is_enabled():
+        payload, status_code = inference_client.post_json(
+            "api/ai/sentiment/", {"text": text}
+        )
+        return Response(payload, status=status_code)
+
     try:
         scores = analyzer.polarity_scores(text)
-        polarity = round(scores["compound"], 3)
-
-        if polarity >= SENTIMENT_NEUTRAL_THRESHOLD:
-            tone = "Positive"
-        elif polarity <= -SENTIMENT_NEUTRAL_THRESHOLD:
-            tone = "Negative"
-        else:
-            tone = "Neutral"
-
-        return Response({"polarity": polarity, "tone": tone}, status=200)
+        return Response(sentiment_payload(scores), status=200)
 
     except Exception as e:
         return Response({"error": f"Model error: {str(e)}"}, status=500)
 
 
+def _csv_response(entry: CsvAnalysisResult, file_name: str, cached: bool) -> Response:
+    """
+    Builds the CSV analysis response from a stored result.
+    """
+    return Response(
+        {
+            "success": True,
+            **entry.result,
+            "fileName": file_name,
+            "analysisId": entry.id,
+            "fingerprint": entry.fingerprint,
+            "cached": cached,
+        },
+        status=200,
+    )
+
+
 @api_view(["POST"])
 @permission_classes([AllowAny])
 def csv_analysis_view(request):
@@ -243,10 +449,16 @@ def csv_analysis_view(request):
 
     - Accepts multipart file upload
     - Validates if file is CSV
-    - Parses CSV using pandas
-    - Calculates:
+    - Fingerprints the upload (streaming SHA-256) and returns the stored
+      result when the same file was analysed before
+    - Optional "fingerprint" field skips reading the upload on a cache hit
+    - Optional "previousId" field treats the upload as rows appended to a
+      stored result and merges the statistics instead of starting over
+    - Optional "query" field (JSON) runs a grouped aggregation with
+      filters, returned as "groups" (see ai_engines.csv_query)
+    - Otherwise parses CSV using pandas and calculates:
         rows, columns, columnNames,
-        numeric columns min/max/avg
+        numeric columns min/max/avg/std/distinct
     """
 
     service_key = request.headers.get("X-Service-Key")
@@ -255,6 +467,40 @@ def csv_analysis_view(request):
     if not expected_key or service_key != expected_key:
         return Response({"error": "Unauthorized service request"}, status=401)
 
+    try:
+        query = parse_query(request.data.get("query"))
+    except ValueError as e:
+        return Response({"error": f"Invalid query: {str(e)}"}, status=400)
+
+    opts_key = options_key({"query": query} if query else {})
+
+    previous_id = str(request.data.get("previousId") or "").strip()
+    previous = None
+    if previous_id:
+        if not previous_id.isdigit():
+            return Response({"error": "previousId must be an integer"}, status=400)
+        previous = CsvAnalysisResult.objects.filter(pk=previous_id).first()
+        if previous is None:
+            return Response({"error": "Previous result not found"}, status=404)
+        if not previous.state or previous.options_key != opts_key:
+            return Response({"error": "Previous result cannot be extended"}, status=400)
+
+    known_fingerprint = (request.data.get("fingerprint") or "").strip().lower()
+    if known_fingerprint:
+        # With previousId the fingerprint names the appended rows only; the
+        # stored result for the combined file is keyed by the chained one.
+        if previous is not None:
+            known_fingerprint = chain_fingerprint(
+                previous.fingerprint, known_fingerprint
+            )
+        entry = CsvAnalysisResult.objects.filter(
+            fingerprint=known_fingerprint, options_key=opts_key
+        ).first()
+        if entry is not None:
+            upload = request.FILES.get("file")
+            file_name = upload.name if upload else entry.file_name
+            return _csv_response(entry, file_name, cached=True)
+
     if "file" not in request.FILES:
         return Response({"error": "CSV file is required"}, status=400)
 
@@ -263,38 +509,191 @@ def csv_analysis_view(request):
     if not file.name.lower().endswith(".csv"):
         return Response({"error": "Only CSV files are supported"}, status=400)
 
-    try:
-        df = pd.read_csv(file)
+    fingerprint = fingerprint_upload(file)
+    if previous is not None:
+        fingerprint = chain_fingerprint(previous.fingerprint, fingerprint)
+
+    entry = CsvAnalysisResult.objects.filter(
+        fingerprint=fingerprint, options_key=opts_key
+    ).first()
+    if entry is not None:
+        return _csv_response(entry, file.name, cached=True)
+
+    if inference_client.is_enabled():
+        payload, status_code = inference_client.analyze_csv(file, query)
+        if status_code != 200:
+            return Response(payload, status=status_code)
+        state = payload["state"]
+    else:
+        try:
+            if query is None:
+                state = compute_state(file)
+            else:
+                state = compute_state_with_query(file, query)
+        except QueryError as e:
+            return Response({"error": f"Invalid query: {str(e)}"}, status=400)
+        except Exception as e:
+            return Response({"error": f"Failed to parse CSV: {str(e)}"}, status=400)
+
+    if previous is not None:
+        try:
+            merged = merge_states(previous.state, state)
+            if query is not None:
+                merged["groups"] = merge_group_states(
+                    previous.state["groups"], state["groups"], query
+                )
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+        state = merged
+
+    result = summarize_state(state)
+    if query is not None:
+        result["groups"] = summarize_groups(state["groups"], query)
+
+    entry, created = CsvAnalysisResult.objects.get_or_create(
+        fingerprint=fingerprint,
+        options_key=opts_key,
+        defaults={"file_name": file.name, "result": result, "state": state},
+    )
+    return _csv_response(entry, file.name, cached=not created)
 
-        rows = len(df)
-        columns = len(df.columns)
-        column_names = list(df.columns)
 
-        numeric_summary = {}
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def csv_result_view(request, pk: int):
+    """
+    Stored CSV analysis lookup (GET /api/ai/csv/<id>/).
+    Lets callers pass an analysis ID around instead of the full payload.
+    Requires X-Service-Key.
+    """
+    service_key = request.headers.get("X-Service-Key")
+    expected_key = getattr(settings, "DJANGO_SERVICE_KEY", None)
 
-        numeric_df = df.select_dtypes(include="number")
-        for col in numeric_df.columns:
-            min_value = numeric_df[col].min()
-            max_value = numeric_df[col].max()
-            avg_value = numeric_df[col].mean()
+    if not expected_key or service_key != expected_key:
+        return Response({"error": "Unauthorized service request"}, status=401)
+
+    entry = CsvAnalysisResult.objects.filter(pk=pk).first()
+    if entry is None:
+        return Response({"error": "Analysis result not found"}, status=404)
 
-            numeric_summary[col] = {
-                "min": None if pd.isna(min_value) else float(min_value),
-                "max": None if pd.isna(max_value) else float(max_value),
-                "avg": None if pd.isna(avg_value) else float(round(avg_value, 4)),
-            }
+    return _csv_response(entry, entry.file_name, cached=True)
 
+
+def _export(request, queryset, fields, name: str, apply_filters):
+    """
+    Validates the output format and filters, then streams the export.
+    """
+    output = (request.query_params.get("output") or "csv").lower()
+    if output not in EXPORT_FORMATS:
         return Response(
-            {
-                "success": True,
-                "rows": rows,
-                "columns": columns,
-                "columnNames": column_names,
-                "numericSummary": numeric_summary,
-                "fileName": file.name,
-            },
-            status=200,
+            {"error": f"output must be one of: {', '.join(EXPORT_FORMATS)}"},
+            status=400,
         )
 
-    except Exception as e:
-        return Response({"error": f"Failed to parse CSV: {str(e)}"}, status=400)
+    try:
+        queryset = apply_filters(queryset, request.query_params)
+    except ValueError as e:
+        return Response({"error": str(e)}, status=400)
+
+    return stream_export(queryset, fields, output, name)
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def export_tasks_view(request):
+    """
+    Bulk task export (GET /api/export/tasks/).
+
+    - output: csv (default) or ndjson
+    - Optional filters: project, done, created_after, created_before
+      (ISO date or datetime)
+    Rows are streamed, so memory use does not grow with the table.
+    """
+    return _export(request, Task.objects.all(), TASK_FIELDS, "tasks", filter_tasks)
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def export_projects_view(request):
+    """
+    Bulk project export (GET /api/export/projects/).
+
+    - output: csv (default) or ndjson
+    - Optional filters: created_after, created_before (ISO date or datetime)
+    """
+    return _export(
+        request, Project.objects.all(), PROJECT_FIELDS, "projects", filter_created
+    )
+
+
+def _profile_summary(profile: RequestProfile) -> dict:
+    return {
+        "id": profile.id,
+        "view": profile.view,
+        "method": profile.method,
+        "path": profile.path,
+        "statusCode": profile.status_code,
+        "sampled": profile.sampled,
+        "durationMs": profile.duration_ms,
+        "queryCount": profile.query_count,
+        "createdAt": profile.created_at,
+    }
+
+
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def profile_list_view(request):
+    """
+    Recent request profiles (GET /api/profiles/), newest first.
+    Optional "view" filter. Requires staff auth or X-Service-Key.
+    """
+    if not is_profiler(request):
+        return Response({"error": "Unauthorized profiling request"}, status=401)
+
+    profiles = RequestProfile.objects.defer("queries", "stacks").order_by("-id")
+    view = request.query_params.get("view")
+    if view:
+        profiles = profiles.filter(view=view)
+
+    return Response([_profile_summary(p) for p in profiles[:100]], status=200)
+
+
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def profile_view(request, pk: int):
+    """
+    Stored request profile with its SQL query log (GET /api/profiles/<id>/).
+    Requires staff auth or X-Service-Key.
+    """
+    if not is_profiler(request):
+        return Response({"error": "Unauthorized profiling request"}, status=401)
+
+    profile = RequestProfile.objects.filter(pk=pk).first()
+    if profile is None:
+        return Response({"error": "Profile not found"}, status=404)
+
+    return Response(
+        {**_profile_summary(profile), "queries": profile.queries}, status=200
+    )
+
+
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def profile_flamegraph_view(request, pk: int):
+    """
+    Sampled stacks of a profile in folded format, for flamegraph.pl or
+    speedscope (GET /api/profiles/<id>/flamegraph/).
+    Requires staff auth or X-Service-Key.
+    """
+    if not is_profiler(request):
+        return Response({"error": "Unauthorized profiling request"}, status=401)
+
+    profile = RequestProfile.objects.filter(pk=pk).first()
+    if profile is None:
+        return Response({"error": "Profile not found"}, status=404)
+
+    response = HttpResponse(profile.stacks, content_type="text/plain")
+    response["Content-Disposition"] = (
+        f'attachment; filename="profile-{profile.id}.folded"'
+    )
+    return response
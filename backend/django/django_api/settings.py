@@ -3,10 +3,12 @@ Django settings for the django_api project.
 
 Contains:
     - Installed apps (including Django REST Framework)
-    - Middleware and templates
+    - Middleware (including negotiated response compression) and templates
     - SQLite database configuration
     - Static files and localization setup
     - Environment variables for AI service (DJANGO_SERVICE_KEY)
+    - Optional inference service proxy (INFERENCE_SERVICE_URL)
+    - Opt-in request profiling (DJANGO_PROFILING_ENABLED)
 
 Purpose:
     Central configuration file used by manage.py and WSGI/ASGI
@@ -64,6 +66,41 @@ if not DJANGO_SERVICE_KEY:
         "DJANGO_SERVICE_KEY environment variable is required for inter-service auth."
     )
 
+# Optional standalone inference service (backend/python). When set, the AI
+# endpoints proxy model work to it through a pooled HTTP client.
+INFERENCE_SERVICE_URL = os.getenv("INFERENCE_SERVICE_URL", "").rstrip("/")
+INFERENCE_SERVICE_KEY = os.getenv("INFERENCE_SERVICE_KEY", DJANGO_SERVICE_KEY)
+INFERENCE_SERVICE_TIMEOUT = float(os.getenv("INFERENCE_SERVICE_TIMEOUT", "60"))
+INFERENCE_SERVICE_POOL_SIZE = int(os.getenv("INFERENCE_SERVICE_POOL_SIZE", "10"))
+
+# Opt-in request profiling (api/profiling.py). When enabled, staff users and
+# service callers can send "X-Profile: 1", and PROFILING_SAMPLE_RATE of all
+# requests to profiled views are recorded as well.
+PROFILING_ENABLED = os.getenv("DJANGO_PROFILING_ENABLED", "False").lower() in (
+    "true",
+    "1",
+    "yes",
+)
+PROFILING_SAMPLE_RATE = float(os.getenv("DJANGO_PROFILING_SAMPLE_RATE", "0"))
+PROFILING_INTERVAL = float(os.getenv("DJANGO_PROFILING_INTERVAL", "0.001"))
+# Only the newest PROFILING_MAX_PROFILES profiles are kept.
+PROFILING_MAX_PROFILES = int(os.getenv("DJANGO_PROFILING_MAX_PROFILES", "500"))
+
+# Process pool size for hashing passwords in bulk registration (api/passwords.py).
+PASSWORD_HASH_WORKERS = int(
+    os.getenv("DJANGO_PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1))
+)
+# Users per bulk registration request. All passwords are hashed inside the
+# request, so the default keeps it to ~12 s of PBKDF2 work (~0.5 s a hash).
+BULK_REGISTER_MAX_USERS = int(
+    os.getenv("DJANGO_BULK_REGISTER_MAX_USERS", str(25 * PASSWORD_HASH_WORKERS))
+)
+
+# Responses of at least this many bytes are compressed with zstd, brotli or
+# gzip (brotli/zstd need the `Brotli` / `zstandard` packages from
+# requirements.txt; without them only gzip is offered).
+COMPRESSION_MIN_SIZE = int(os.getenv("DJANGO_COMPRESSION_MIN_SIZE", "1024"))
+
 
 # Application definition
 
@@ -83,6 +120,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "api.compression.CompressionMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.common.CommonMiddleware",
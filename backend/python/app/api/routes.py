@@ -0,0 +1,162 @@
+"""
+Inference endpoints. Paths, request bodies and responses mirror the
+Django AI endpoints (backend/django/api/views.py) so Django can proxy
+to this service transparently.
+"""
+
+import asyncio
+import logging
+import tempfile
+from typing import Optional
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    Form,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+)
+from fastapi import UploadFile
+
+from app import config
+from app.models.schemas import TextRequest
+from app.services import engines
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# Raw CSV bodies up to this size stay in memory, larger ones go to disk.
+CSV_SPOOL_MAX_SIZE = 1024 * 1024
+
+
+def require_service_key(x_service_key: Optional[str] = Header(default=None)) -> None:
+    """Rejects requests without the shared X-Service-Key."""
+    if not config.SERVICE_KEY or x_service_key != config.SERVICE_KEY:
+        raise HTTPException(status_code=401, detail="Unauthorized service request")
+
+
+@router.get("/health/")
+async def health_check():
+    """Simple public endpoint for service monitoring."""
+    return {"status": "ok"}
+
+
+@router.post("/api/ai/summarize/", dependencies=[Depends(require_service_key)])
+async def summarize(body: TextRequest, request: Request):
+    """
+    Summarization (short→medium→long text logic). BART requests with the
+    same generation options are batched into one model call.
+    """
+    text = (body.text or "").strip()
+    if not text:
+        raise HTTPException(status_code=400, detail="Text is required")
+
+    if len(text) > engines.MAX_INPUT_CHARS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Input must be <= {engines.MAX_INPUT_CHARS} characters",
+        )
+
+    word_count = len(text.split())
+    try:
+        if engines.needs_model(word_count):
+            options = tuple(sorted(engines.bart_options(word_count).items()))
+            summary = await request.app.state.summary_batcher.submit(text, options)
+            strategy = "bart-abstractive"
+        else:
+            summary, strategy, word_count = engines.summarize_text(text)
+    except ImportError as e:
+        # torch/transformers come with the optional "models" extra only.
+        logger.error(f"Summarization model is not installed: {e}")
+        raise HTTPException(
+            status_code=503, detail="Summarization model is not installed"
+        )
+    except RuntimeError as e:
+        logger.error(f"Summarization model error: {e}")
+        raise HTTPException(status_code=500, detail="Model error")
+
+    return engines.summary_payload(text, summary, strategy, word_count)
+
+
+@router.post("/api/ai/sentiment/", dependencies=[Depends(require_service_key)])
+async def sentiment(body: TextRequest, request: Request):
+    """VADER sentiment with a ±0.25 neutral threshold, batched per tick."""
+    text = (body.text or "").strip()
+    if not text:
+        raise HTTPException(status_code=400, detail="Text is required")
+
+    try:
+        return await request.app.state.sentiment_batcher.submit(text)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Model error: {str(e)}")
+
+
+@router.post("/api/ai/csv/", dependencies=[Depends(require_service_key)])
+async def csv_analysis(
+    request: Request,
+    file: Optional[UploadFile] = File(default=None),
+    query: Optional[str] = Form(default=None),
+):
+    """
+    CSV analysis. The upload is streamed to a spooled temporary file and
+    parsed in chunks on the worker pool. Besides the Django response fields
+    the body carries the mergeable "state" so callers can store and extend it.
+    """
+    if file is None:
+        raise HTTPException(status_code=400, detail="CSV file is required")
+
+    return await _analyze_csv(request, file.file, file.filename, query)
+
+
+@router.post("/api/ai/csv/stream/", dependencies=[Depends(require_service_key)])
+async def csv_analysis_stream(
+    request: Request,
+    file_name: str = Query(default="", alias="fileName"),
+    query: Optional[str] = None,
+):
+    """
+    CSV analysis of a raw (non-multipart) CSV request body, so callers can
+    stream the upload without building a multipart body first. "fileName"
+    and the optional "query" are passed as query parameters.
+    """
+    with tempfile.SpooledTemporaryFile(max_size=CSV_SPOOL_MAX_SIZE) as spool:
+        async for chunk in request.stream():
+            spool.write(chunk)
+        spool.seek(0)
+        return await _analyze_csv(request, spool, file_name, query)
+
+
+async def _analyze_csv(request: Request, file, filename: str, query: Optional[str]):
+    if not (filename or "").lower().endswith(".csv"):
+        raise HTTPException(status_code=400, detail="Only CSV files are supported")
+
+    try:
+        parsed_query = engines.parse_query(query)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid query: {str(e)}")
+
+    loop = asyncio.get_running_loop()
+    try:
+        state = await loop.run_in_executor(
+            request.app.state.executor,
+            engines.analyze_csv_upload,
+            file,
+            parsed_query,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    result = engines.summarize_state(state)
+    if parsed_query is not None:
+        result["groups"] = engines.summarize_groups(state["groups"], parsed_query)
+
+    return {
+        "success": True,
+        **result,
+        "fileName": filename,
+        "state": state,
+    }
@@ -0,0 +1,14 @@
+"""Environment-driven settings for the inference service."""
+
+import os
+
+# Shared secret expected in the X-Service-Key header.
+SERVICE_KEY = os.getenv("INFERENCE_SERVICE_KEY")
+
+# Threads running model and CSV work off the event loop.
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "4"))
+
+# Concurrent requests with compatible options are grouped into one model call
+# of up to BATCH_MAX_SIZE items, waiting at most BATCH_MAX_WAIT_MS for peers.
+BATCH_MAX_SIZE = int(os.getenv("INFERENCE_BATCH_MAX_SIZE", "8"))
+BATCH_MAX_WAIT_MS = float(os.getenv("INFERENCE_BATCH_MAX_WAIT_MS", "10"))
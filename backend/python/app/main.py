@@ -1,8 +1,52 @@
-from fastapi import FastAPI
+"""
+Standalone async inference service.
 
-app = FastAPI()
+Runs the summarization, sentiment and CSV-analysis engines outside the
+Django request cycle so inference can scale on separate nodes. Model and
+CSV work runs on a thread pool; concurrent model requests are batched.
 
+    uvicorn app.main:app --workers 2
+"""
 
-@app.get("/")
-def read_root():
-    return {"Hello": "World"}
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from starlette.exceptions import HTTPException
+
+from app import config
+from app.api.routes import router
+from app.services.batching import MicroBatcher
+from app.services.engines import run_sentiment_batch, run_summary_batch
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Creates the worker pool and batchers for the lifetime of the app."""
+    executor = ThreadPoolExecutor(
+        max_workers=config.INFERENCE_WORKERS, thread_name_prefix="inference"
+    )
+    max_wait = config.BATCH_MAX_WAIT_MS / 1000
+
+    app.state.executor = executor
+    app.state.summary_batcher = MicroBatcher(
+        run_summary_batch, executor, config.BATCH_MAX_SIZE, max_wait
+    )
+    app.state.sentiment_batcher = MicroBatcher(
+        run_sentiment_batch, executor, config.BATCH_MAX_SIZE, max_wait
+    )
+    try:
+        yield
+    finally:
+        executor.shutdown(wait=True)
+
+
+app = FastAPI(title="Inference service", lifespan=lifespan)
+app.include_router(router)
+
+
+@app.exception_handler(HTTPException)
+async def error_response(_request: Request, exc: HTTPException):
+    """Reports errors as {"error": ...} like the Django API does."""
+    return JSONResponse({"error": exc.detail}, status_code=exc.status_code)
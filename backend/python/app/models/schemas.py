@@ -0,0 +1,11 @@
+"""Request schemas of the inference service."""
+
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class TextRequest(BaseModel):
+    """Body of the summarize and sentiment endpoints."""
+
+    text: Optional[str] = None
@@ -0,0 +1,71 @@
+"""Request micro-batching for model calls."""
+
+import asyncio
+from concurrent.futures import Executor
+from typing import Any, Callable, Hashable, List
+
+
+class MicroBatcher:
+    """
+    Groups concurrent submissions with the same key into one call of
+    fn(key, items) -> results, run on an executor.
+
+    A batch is flushed when it reaches max_size items or max_wait seconds
+    after its first item arrived, whichever comes first.
+    """
+
+    def __init__(
+        self,
+        fn: Callable[[Hashable, List[Any]], List[Any]],
+        executor: Executor,
+        max_size: int = 8,
+        max_wait: float = 0.01,
+    ):
+        self._fn = fn
+        self._executor = executor
+        self._max_size = max_size
+        self._max_wait = max_wait
+        self._pending = {}
+        self._timers = {}
+        self._tasks = set()
+
+    async def submit(self, item: Any, key: Hashable = None) -> Any:
+        """Queues an item and waits for its result."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        batch = self._pending.setdefault(key, [])
+        batch.append((item, future))
+        if len(batch) >= self._max_size:
+            self._flush(key)
+        elif len(batch) == 1:
+            self._timers[key] = loop.call_later(self._max_wait, self._flush, key)
+
+        return await future
+
+    def _flush(self, key: Hashable) -> None:
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+
+        batch = self._pending.pop(key, None)
+        if batch:
+            task = asyncio.ensure_future(self._run(key, batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, key: Hashable, batch: list) -> None:
+        loop = asyncio.get_running_loop()
+        items = [item for item, _ in batch]
+
+        try:
+            results = await loop.run_in_executor(self._executor, self._fn, key, items)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
@@ -0,0 +1,68 @@
+"""
+Inference engines behind the service.
+
+The summarization, sentiment and CSV engines come from the shared
+ai-engines package (shared/engines), which the Django API installs as well,
+so both services give identical results. This module wraps them in the
+synchronous runner functions executed on the worker pool.
+"""
+
+from ai_engines.csv_analysis import compute_state, summarize_state
+from ai_engines.csv_query import (
+    QueryError,
+    compute_state_with_query,
+    parse_query,
+    summarize_groups,
+)
+from ai_engines.sentiment import SentimentEngine, sentiment_payload
+from ai_engines.summarization import (
+    MAX_INPUT_CHARS,
+    bart_options,
+    needs_model,
+    summarize_batch,
+    summarize_text,
+    summary_payload,
+)
+
+__all__ = [
+    "MAX_INPUT_CHARS",
+    "analyze_csv_upload",
+    "bart_options",
+    "needs_model",
+    "parse_query",
+    "run_sentiment_batch",
+    "run_summary_batch",
+    "summarize_groups",
+    "summarize_state",
+    "summarize_text",
+    "summary_payload",
+]
+
+sentiment_engine = SentimentEngine()
+
+
+def run_sentiment_batch(_key, texts: list) -> list:
+    """Scores a batch of texts; returns sentiment endpoint payloads."""
+    return [sentiment_payload(sentiment_engine.polarity_scores(t)) for t in texts]
+
+
+def run_summary_batch(options: tuple, texts: list) -> list:
+    """Summarizes a batch of texts that share the same BART options."""
+    return summarize_batch(texts, dict(options))
+
+
+def analyze_csv_upload(file, query) -> dict:
+    """
+    Computes the mergeable CSV state (and grouped query state, if any).
+
+    Raises:
+        ValueError: With the client-facing error message.
+    """
+    try:
+        if query is None:
+            return compute_state(file)
+        return compute_state_with_query(file, query)
+    except QueryError as e:
+        raise ValueError(f"Invalid query: {str(e)}") from e
+    except Exception as e:
+        raise ValueError(f"Failed to parse CSV: {str(e)}") from e
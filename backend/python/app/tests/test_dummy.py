@@ -1,6 +0,0 @@
-# This is a dummy test to ensure the CI pipeline is functional.
-# Remove this file when you implement real backend functionality.
-
-
-def test_dummy_ci_check():
-    assert 1 + 1 == 2
@@ -0,0 +1,131 @@
+"""Tests for the inference service endpoints and request batching."""
+
+import asyncio
+import io
+import json
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from ai_engines import summarization
+from fastapi.testclient import TestClient
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+from app import config
+from app.main import app
+from app.services.batching import MicroBatcher
+
+SERVICE_KEY = "test-key"
+
+
+@pytest.fixture()
+def client(monkeypatch):
+    monkeypatch.setattr(config, "SERVICE_KEY", SERVICE_KEY)
+    with TestClient(app, headers={"X-Service-Key": SERVICE_KEY}) as test_client:
+        yield test_client
+
+
+def test_requires_service_key(client):
+    response = client.post(
+        "/api/ai/sentiment/", json={"text": "hi"}, headers={"X-Service-Key": "x"}
+    )
+
+    assert response.status_code == 401
+    assert response.json() == {"error": "Unauthorized service request"}
+
+
+def test_sentiment_matches_vader(client):
+    text = "Great work on the release, thanks!"
+    response = client.post("/api/ai/sentiment/", json={"text": text})
+
+    compound = SentimentIntensityAnalyzer().polarity_scores(text)["compound"]
+    assert response.status_code == 200
+    assert response.json() == {"polarity": round(compound, 3), "tone": "Positive"}
+
+
+def test_short_text_summary(client):
+    response = client.post("/api/ai/summarize/", json={"text": "Short note."})
+
+    assert response.status_code == 200
+    assert response.json()["meta"]["strategy"] == "original-too-short"
+    assert client.post("/api/ai/summarize/", json={}).status_code == 400
+
+
+def test_long_text_without_model_extra(client, monkeypatch):
+    monkeypatch.setitem(sys.modules, "transformers", None)
+    monkeypatch.setattr(summarization, "_summarizer", None)
+    text = " ".join(["The release went out on time."] * 15)
+    response = client.post("/api/ai/summarize/", json={"text": text})
+
+    assert response.status_code == 503
+    assert response.json() == {"error": "Summarization model is not installed"}
+
+
+def test_csv_analysis_with_query(client):
+    content = b"category,price\na,1\na,3\nb,10\n"
+    query = {"groupBy": "category", "aggregations": [{"op": "mean", "column": "price"}]}
+    response = client.post(
+        "/api/ai/csv/",
+        files={"file": ("data.csv", io.BytesIO(content), "text/csv")},
+        data={"query": json.dumps(query)},
+    )
+
+    body = response.json()
+    assert response.status_code == 200
+    assert body["rows"] == 3
+    assert body["numericSummary"]["price"]["avg"] == 4.6667
+    assert body["groups"] == [
+        {"category": "a", "mean_price": 2.0},
+        {"category": "b", "mean_price": 10.0},
+    ]
+    assert body["state"]["rows"] == 3
+
+
+def test_csv_analysis_of_raw_body(client):
+    query = {"groupBy": "category", "aggregations": [{"op": "sum", "column": "price"}]}
+    response = client.post(
+        "/api/ai/csv/stream/",
+        params={"fileName": "data.csv", "query": json.dumps(query)},
+        content=b"category,price\na,1\na,3\nb,10\n",
+        headers={"Content-Type": "text/csv"},
+    )
+
+    body = response.json()
+    assert response.status_code == 200
+    assert body["fileName"] == "data.csv"
+    assert body["groups"] == [
+        {"category": "a", "sum_price": 4.0},
+        {"category": "b", "sum_price": 10.0},
+    ]
+
+
+def test_csv_rejects_invalid_query(client):
+    response = client.post(
+        "/api/ai/csv/",
+        files={"file": ("data.csv", io.BytesIO(b"a\n1\n"), "text/csv")},
+        data={"query": "{"},
+    )
+
+    assert response.status_code == 400
+    assert response.json()["error"].startswith("Invalid query")
+
+
+def test_micro_batcher_groups_concurrent_requests():
+    calls = []
+    lock = threading.Lock()
+
+    def double(key, items):
+        with lock:
+            calls.append((key, list(items)))
+        return [item * 2 for item in items]
+
+    async def run():
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            batcher = MicroBatcher(double, executor, max_size=3, max_wait=0.05)
+            return await asyncio.gather(
+                *(batcher.submit(i, key=i % 2) for i in range(5))
+            )
+
+    assert asyncio.run(run()) == [0, 2, 4, 6, 8]
+    assert sorted(calls) == [(0, [0, 2, 4]), (1, [1, 3])]
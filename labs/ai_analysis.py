@@ -1,30 +1,28 @@
 """Simple data analysis script using requests, pandas, and numpy.
 
-This script fetches product data from DummyJSON API,
-performs basic statistical analysis (mean, std, grouping),
-and exports the dataset to CSV.
+This script fetches the full product catalog from DummyJSON API,
+streams it to CSV page by page, and performs basic statistical
+analysis (mean, std, grouping) on the exported dataset.
 """
 
-import requests
 import pandas as pd
 import numpy as np
 
+from ingest import build_session, iter_products, write_csv
+
 # === CONFIGURATION ===
-API_URL = "https://dummyjson.com/products?limit=100"
 OUTPUT_PATH = "labs/product_data.csv"
+ANALYSIS_COLUMNS = ["title", "category", "price"]
 TIMEOUT = 10
 
 
-def fetch_data(url: str, timeout: int = 10) -> list[dict]:
-    """Send a GET request to the given API URL and return list of products as JSON."""
-    response = requests.get(url, timeout=timeout)
-
-    if response.status_code != 200:
-        raise RuntimeError(f"API request failed with status {response.status_code}")
+def fetch_data(path: str, timeout: int = 10) -> int:
+    """Fetch all product pages concurrently and stream them into a CSV file."""
+    with build_session() as session:
+        rows = write_csv(iter_products(session, timeout=timeout), path)
 
-    products = response.json().get("products", [])
-    print(f"Fetched {len(products)} products from API.")
-    return products
+    print(f"Fetched {rows} products from API.")
+    return rows
 
 
 def analyze_data(df: pd.DataFrame) -> None:
@@ -47,20 +45,15 @@ def analyze_data(df: pd.DataFrame) -> None:
     print(avg_by_category)
 
 
-def save_to_csv(df: pd.DataFrame, path: str) -> None:
-    """Save the DataFrame to a CSV file."""
-    df.to_csv(path, index=False)
-    print(f"\nSaved full dataset to {path}")
-
-
 def main() -> None:
     """Main script entry point for AI basics demo."""
-    products = fetch_data(API_URL, TIMEOUT)
-    df = pd.DataFrame(products)
+    fetch_data(OUTPUT_PATH, TIMEOUT)
+    print(f"\nSaved full dataset to {OUTPUT_PATH}")
+
+    df = pd.read_csv(OUTPUT_PATH, usecols=ANALYSIS_COLUMNS)
     print(df.head())
 
     analyze_data(df)
-    save_to_csv(df, OUTPUT_PATH)
 
 
 if __name__ == "__main__":
@@ -3,13 +3,13 @@
 import requests
 import sys
 
+from ingest import build_session, iter_todos
+
 
 def fetch_todos():
-    """Fetch todos from JSONPlaceholder API and return parsed JSON."""
-    url = "https://jsonplaceholder.typicode.com/todos"
-    response = requests.get(url, timeout=10)
-    response.raise_for_status()
-    return response.json()
+    """Fetch all todo pages concurrently from JSONPlaceholder API."""
+    with build_session() as session:
+        return [todo for page in iter_todos(session) for todo in page]
 
 
 def main():
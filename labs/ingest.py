@@ -0,0 +1,225 @@
+"""Reusable ingestion helpers for the labs scripts.
+
+Provides a pooled requests session with retry/backoff, concurrent
+paginated fetching with a concurrency cap, and writers that stream pages
+to CSV or Parquet instead of building the whole DataFrame in memory.
+"""
+
+import json
+import os
+import tempfile
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# === CONFIGURATION ===
+DEFAULT_TIMEOUT = 10
+DEFAULT_PAGE_SIZE = 100
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.5
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+PRODUCTS_URL = "https://dummyjson.com/products"
+TODOS_URL = "https://jsonplaceholder.typicode.com/todos"
+
+
+def build_session(
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    retries: int = DEFAULT_RETRIES,
+    backoff: float = DEFAULT_BACKOFF,
+) -> requests.Session:
+    """Return a session whose connection pool fits max_workers and which
+    retries idempotent GETs on connection errors and RETRY_STATUSES."""
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=("GET",),
+    )
+    adapter = HTTPAdapter(
+        pool_connections=max_workers, pool_maxsize=max_workers, max_retries=retry
+    )
+
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def _get(
+    session: requests.Session, url: str, params: dict, timeout: int
+) -> requests.Response:
+    response = session.get(url, params=params, timeout=timeout)
+    response.raise_for_status()
+    return response
+
+
+def iter_pages(
+    session: requests.Session,
+    url: str,
+    *,
+    items_key: str | None = None,
+    total_header: str | None = None,
+    offset_param: str = "skip",
+    limit_param: str = "limit",
+    page_size: int = DEFAULT_PAGE_SIZE,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    timeout: int = DEFAULT_TIMEOUT,
+) -> Iterator[list[dict]]:
+    """Yield the pages of an offset/limit paginated endpoint in order.
+
+    The first page is fetched alone to learn the total, read from the
+    "total" field (when items_key wraps the list) or from total_header.
+    Remaining pages are fetched concurrently, with at most max_workers
+    requests in flight and at most 2 * max_workers pages buffered.
+    Without a known total, pages are fetched one by one until a short page.
+    """
+
+    def fetch(offset: int) -> requests.Response:
+        params = {offset_param: offset, limit_param: page_size}
+        return _get(session, url, params, timeout)
+
+    def items(response: requests.Response) -> list[dict]:
+        payload = response.json()
+        return payload[items_key] if items_key else payload
+
+    first = fetch(0)
+    payload = first.json()
+    page = payload[items_key] if items_key else payload
+    yield page
+
+    if items_key:
+        total = payload.get("total")
+    elif total_header:
+        total = first.headers.get(total_header)
+    else:
+        total = None
+
+    if total is None:
+        offset = len(page)
+        while len(page) == page_size:
+            page = items(fetch(offset))
+            if page:
+                yield page
+            offset += len(page)
+        return
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        pending = deque()
+        for offset in range(page_size, int(total), page_size):
+            pending.append(pool.submit(fetch, offset))
+            if len(pending) >= 2 * max_workers:
+                yield items(pending.popleft().result())
+        while pending:
+            yield items(pending.popleft().result())
+
+
+def iter_products(session: requests.Session, **kwargs) -> Iterator[list[dict]]:
+    """Yield pages of the DummyJSON product catalog."""
+    return iter_pages(session, PRODUCTS_URL, items_key="products", **kwargs)
+
+
+def iter_todos(session: requests.Session, **kwargs) -> Iterator[list[dict]]:
+    """Yield pages of the JSONPlaceholder todo list."""
+    return iter_pages(
+        session,
+        TODOS_URL,
+        total_header="X-Total-Count",
+        offset_param="_start",
+        limit_param="_limit",
+        **kwargs,
+    )
+
+
+def write_csv(pages: Iterable[list[dict]], path: str) -> int:
+    """Append each page to a CSV file as it arrives and return the row count.
+    Columns are fixed by the first page; later extra fields are dropped."""
+    columns = None
+    rows = 0
+
+    for page in pages:
+        if not page:
+            continue
+        df = pd.DataFrame(page)
+        if columns is None:
+            columns = list(df.columns)
+            df.to_csv(path, index=False)
+        else:
+            df.reindex(columns=columns).to_csv(
+                path, mode="a", header=False, index=False
+            )
+        rows += len(df)
+
+    return rows
+
+
+def _page_tables(pages: Iterable[list[dict]]) -> Iterator:
+    """Yield each non-empty page as a pyarrow Table with the first page's
+    columns, nested values (lists/dicts) encoded as JSON strings."""
+    import pyarrow as pa
+
+    columns = None
+    for page in pages:
+        if not page:
+            continue
+        df = pd.DataFrame(page)
+        columns = columns or list(df.columns)
+        df = df.reindex(columns=columns)
+        for col in df.select_dtypes(include="object").columns:
+            df[col] = df[col].map(
+                lambda v: json.dumps(v) if isinstance(v, (list, dict)) else v
+            )
+        yield pa.Table.from_pandas(df, preserve_index=False).replace_schema_metadata()
+
+
+def _write_tables(tables: Iterable, path: str, schema) -> int:
+    import pyarrow.parquet as pq
+
+    writer = None
+    rows = 0
+    try:
+        for table in tables:
+            if writer is None:
+                writer = pq.ParquetWriter(path, schema)
+            writer.write_table(table.cast(schema))
+            rows += table.num_rows
+    finally:
+        if writer is not None:
+            writer.close()
+
+    return rows
+
+
+def write_parquet(pages: Iterable[list[dict]], path: str, schema=None) -> int:
+    """Write each page as a Parquet row group and return the row count.
+    Nested values (lists/dicts) are stored as JSON strings. Requires pyarrow.
+
+    Without an explicit pyarrow `schema`, each page is first spooled to a
+    temporary file and the column types are unified across all pages (ints
+    widen to floats, all-null columns take the later pages' type), so memory
+    stays bounded by one page at the cost of writing the rows twice."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    if schema is not None:
+        return _write_tables(_page_tables(pages), path, schema)
+
+    with tempfile.TemporaryDirectory() as spool:
+        parts = []
+        schemas = []
+        for table in _page_tables(pages):
+            part = os.path.join(spool, f"{len(parts)}.parquet")
+            pq.write_table(table, part)
+            parts.append(part)
+            schemas.append(table.schema)
+        if not parts:
+            return 0
+
+        schema = pa.unify_schemas(schemas, promote_options="permissive")
+        return _write_tables((pq.read_table(part) for part in parts), path, schema)
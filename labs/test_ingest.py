@@ -0,0 +1,189 @@
+"""Tests for the ingestion helpers against a local stub HTTP server."""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+import pytest
+import requests
+
+from ingest import build_session, iter_pages, write_csv, write_parquet
+
+PRODUCTS = [
+    {"id": i, "title": f"p{i}", "category": f"c{i % 3}", "price": float(i)}
+    for i in range(1, 96)
+]
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Serves /products (DummyJSON style) and /todos (JSONPlaceholder style)."""
+
+    lock = threading.Lock()
+    in_flight = 0
+    max_in_flight = 0
+    failures = {}
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status: int, body, headers: dict | None = None):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        cls = type(self)
+        with cls.lock:
+            cls.in_flight += 1
+            cls.max_in_flight = max(cls.max_in_flight, cls.in_flight)
+        try:
+            self._handle()
+        finally:
+            with cls.lock:
+                cls.in_flight -= 1
+
+    def _handle(self):
+        parsed = urlparse(self.path)
+        query = {k: int(v[0]) for k, v in parse_qs(parsed.query).items()}
+
+        with self.lock:
+            remaining = self.failures.get(self.path, 0)
+            self.failures[self.path] = max(remaining - 1, 0)
+        if remaining:
+            self._send(503, {"error": "try again"})
+            return
+
+        time.sleep(0.01)
+        if parsed.path == "/products":
+            start, limit = query["skip"], query["limit"]
+            page = PRODUCTS[start : start + limit]
+            self._send(200, {"products": page, "total": len(PRODUCTS)})
+        elif parsed.path == "/todos":
+            start, limit = query["_start"], query["_limit"]
+            page = PRODUCTS[start : start + limit]
+            self._send(200, page, {"X-Total-Count": str(len(PRODUCTS))})
+        elif parsed.path == "/unbounded":
+            start, limit = query["skip"], query["limit"]
+            self._send(200, PRODUCTS[start : start + limit])
+        else:
+            self._send(404, {"error": "not found"})
+
+
+@pytest.fixture()
+def server():
+    StubHandler.max_in_flight = 0
+    StubHandler.failures = {}
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_concurrent_pages_arrive_in_order_with_cap(server):
+    with build_session(max_workers=3) as session:
+        pages = list(
+            iter_pages(
+                session,
+                f"{server}/products",
+                items_key="products",
+                page_size=10,
+                max_workers=3,
+            )
+        )
+
+    assert [item for page in pages for item in page] == PRODUCTS
+    assert len(pages) == 10
+    assert 1 < StubHandler.max_in_flight <= 3
+
+
+def test_total_header_and_unknown_total(server):
+    with build_session() as session:
+        todos = iter_pages(
+            session,
+            f"{server}/todos",
+            total_header="X-Total-Count",
+            offset_param="_start",
+            limit_param="_limit",
+            page_size=20,
+        )
+        unbounded = iter_pages(session, f"{server}/unbounded", page_size=19)
+
+        assert [item for page in todos for item in page] == PRODUCTS
+        assert [item for page in unbounded for item in page] == PRODUCTS
+
+
+def test_retries_transient_errors(server):
+    StubHandler.failures = {"/products?skip=0&limit=50": 2}
+
+    with build_session(backoff=0) as session:
+        pages = list(
+            iter_pages(
+                session, f"{server}/products", items_key="products", page_size=50
+            )
+        )
+
+    assert sum(len(page) for page in pages) == len(PRODUCTS)
+
+
+def test_gives_up_after_retries(server):
+    StubHandler.failures = {"/products?skip=0&limit=50": 5}
+
+    with build_session(retries=1, backoff=0) as session:
+        with pytest.raises(requests.exceptions.RetryError):
+            list(
+                iter_pages(
+                    session, f"{server}/products", items_key="products", page_size=50
+                )
+            )
+
+
+def test_write_csv_streams_pages(server, tmp_path):
+    path = tmp_path / "products.csv"
+
+    with build_session() as session:
+        rows = write_csv(
+            iter_pages(
+                session, f"{server}/products", items_key="products", page_size=7
+            ),
+            str(path),
+        )
+
+    assert rows == len(PRODUCTS)
+    assert pd.read_csv(path).to_dict("records") == PRODUCTS
+
+
+def test_write_parquet_unifies_page_types(server, tmp_path):
+    pytest.importorskip("pyarrow")
+    path = tmp_path / "products.parquet"
+
+    with build_session() as session:
+        rows = write_parquet(
+            iter_pages(
+                session, f"{server}/products", items_key="products", page_size=7
+            ),
+            str(path),
+        )
+
+    assert rows == len(PRODUCTS)
+    assert pd.read_parquet(path).to_dict("records") == PRODUCTS
+
+    # Ints on the first page, floats later; a column that starts all-null.
+    pages = [
+        [{"id": 1, "price": 1, "note": None}],
+        [{"id": 2, "price": 2.5, "note": "sale"}],
+    ]
+    assert write_parquet(pages, str(path)) == 2
+    assert pd.read_parquet(path).to_dict("records") == [
+        {"id": 1, "price": 1.0, "note": None},
+        {"id": 2, "price": 2.5, "note": "sale"},
+    ]
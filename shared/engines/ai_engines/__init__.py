@@ -0,0 +1,10 @@
+"""
+Framework-free engines shared by the Django API (backend/django) and the
+FastAPI inference service (backend/python), so both give identical results.
+
+Modules:
+    - csv_analysis: mergeable per-column CSV statistics
+    - csv_query: grouped aggregation queries over CSV files
+    - sentiment: cached VADER-compatible sentiment engine
+    - summarization: extractive and BART summarization
+"""
@@ -0,0 +1,239 @@
+"""
+CSV analysis helpers used by the /api/ai/csv/ endpoints.
+
+Includes:
+    - fingerprint_upload: streaming SHA-256 of an uploaded file
+    - options_key: stable hash of the analysis options
+    - compute_state: mergeable per-column statistics of a CSV file
+    - merge_states: combines two states (e.g. prior result + appended rows)
+    - summarize_state: turns a state into the endpoint's JSON payload
+
+A state holds count, sum, min, max, Welford mean/M2 and a KMV distinct-value
+sketch for every numeric column. Merging the state of a file with the state
+of rows appended to it gives the same statistics as analysing the whole file.
+"""
+
+import hashlib
+import json
+import math
+
+import pandas as pd
+
+CSV_CHUNK_ROWS = 50_000
+SKETCH_SIZE = 128
+_HASH_SPACE = 2**64
+
+
+def fingerprint_upload(file) -> str:
+    """
+    Computes the SHA-256 hex digest of an uploaded file chunk by chunk,
+    so large uploads are never held in memory as a whole.
+    The file is rewound afterwards so it can still be parsed.
+    """
+    digest = hashlib.sha256()
+    for chunk in file.chunks():
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def chain_fingerprint(previous: str, delta: str) -> str:
+    """
+    Fingerprint of a result built from a previous result plus appended rows.
+    """
+    return hashlib.sha256(f"{previous}:{delta}".encode("utf-8")).hexdigest()
+
+
+def options_key(options: dict) -> str:
+    """
+    Returns a stable SHA-256 hex digest of the analysis options.
+    Keys are sorted so equivalent option dicts map to the same key.
+    """
+    canonical = json.dumps(options, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _empty_column_state() -> dict:
+    return {
+        "count": 0,
+        "sum": 0.0,
+        "min": None,
+        "max": None,
+        "mean": 0.0,
+        "m2": 0.0,
+        "sketch": [],
+    }
+
+
+def _column_state(series: pd.Series) -> dict:
+    """
+    Mergeable statistics for a single numeric column.
+    """
+    values = series.dropna().astype("float64")
+    if values.empty:
+        return _empty_column_state()
+
+    mean = float(values.mean())
+    hashes = pd.util.hash_pandas_object(values, index=False).unique()
+    hashes.sort()
+
+    return {
+        "count": int(values.size),
+        "sum": float(values.sum()),
+        "min": float(values.min()),
+        "max": float(values.max()),
+        "mean": mean,
+        "m2": float(((values - mean) ** 2).sum()),
+        "sketch": [int(h) for h in hashes[:SKETCH_SIZE]],
+    }
+
+
+def _merge_column_states(a: dict, b: dict) -> dict:
+    """
+    Combines two column states (Chan et al. parallel variance update).
+    """
+    if a["count"] == 0:
+        return b
+    if b["count"] == 0:
+        return a
+
+    count = a["count"] + b["count"]
+    delta = b["mean"] - a["mean"]
+
+    return {
+        "count": count,
+        "sum": a["sum"] + b["sum"],
+        "min": min(a["min"], b["min"]),
+        "max": max(a["max"], b["max"]),
+        "mean": a["mean"] + delta * b["count"] / count,
+        "m2": a["m2"] + b["m2"] + delta**2 * a["count"] * b["count"] / count,
+        "sketch": sorted(set(a["sketch"]) | set(b["sketch"]))[:SKETCH_SIZE],
+    }
+
+
+def _frame_state(df: pd.DataFrame) -> dict:
+    """
+    Mergeable statistics for a parsed chunk of CSV rows.
+    An empty chunk says nothing about column types, so none are recorded.
+    """
+    if df.empty:
+        return {
+            "rows": 0,
+            "columnNames": list(df.columns),
+            "numeric": {},
+            "nonNumeric": [],
+        }
+
+    numeric_columns = set(df.select_dtypes(include="number").columns)
+    return {
+        "rows": len(df),
+        "columnNames": list(df.columns),
+        "numeric": {col: _column_state(df[col]) for col in numeric_columns},
+        "nonNumeric": [col for col in df.columns if col not in numeric_columns],
+    }
+
+
+def merge_states(a: dict, b: dict) -> dict:
+    """
+    Combines two CSV states that share the same columns.
+    A column stays numeric only if neither side saw non-numeric values in it.
+
+    Raises:
+        ValueError: If the column names differ.
+    """
+    if a["columnNames"] != b["columnNames"]:
+        raise ValueError("Appended rows must have the same columns as the prior data")
+
+    non_numeric = set(a["nonNumeric"]) | set(b["nonNumeric"])
+    numeric = {}
+    for col in a["columnNames"]:
+        if col in non_numeric or (col not in a["numeric"] and col not in b["numeric"]):
+            continue
+        numeric[col] = _merge_column_states(
+            a["numeric"].get(col, _empty_column_state()),
+            b["numeric"].get(col, _empty_column_state()),
+        )
+
+    return {
+        "rows": a["rows"] + b["rows"],
+        "columnNames": a["columnNames"],
+        "numeric": numeric,
+        "nonNumeric": [col for col in a["columnNames"] if col in non_numeric],
+    }
+
+
+def _infer_numeric(series: pd.Series) -> pd.Series:
+    """
+    Numeric version of a column read as text, if every value parses as a
+    number (as read_csv would have inferred); otherwise the column unchanged.
+    """
+    converted = pd.to_numeric(series, errors="coerce")
+    if converted.notna().sum() == series.notna().sum():
+        return converted
+    return series
+
+
+def compute_state(file, text_columns=(), on_chunk=None) -> dict:
+    """
+    Parses a CSV file with pandas in chunks of CSV_CHUNK_ROWS rows and
+    returns its mergeable state, so memory stays bounded by the chunk size.
+
+    Columns in text_columns are read as raw strings (typed again for the
+    statistics), and on_chunk(chunk) is called with every parsed chunk, so
+    other aggregations can share the same pass over the file.
+    """
+    dtype = {column: str for column in text_columns} or None
+    state = None
+    for chunk in pd.read_csv(file, dtype=dtype, chunksize=CSV_CHUNK_ROWS):
+        if on_chunk is not None:
+            on_chunk(chunk)
+        typed = chunk.assign(
+            **{
+                column: _infer_numeric(chunk[column])
+                for column in text_columns
+                if column in chunk.columns
+            }
+        )
+        chunk_state = _frame_state(typed)
+        state = chunk_state if state is None else merge_states(state, chunk_state)
+    return state
+
+
+def _distinct_estimate(sketch: list) -> int:
+    """
+    KMV estimate of distinct values; exact below SKETCH_SIZE values.
+    """
+    if len(sketch) < SKETCH_SIZE:
+        return len(sketch)
+    return int(round((SKETCH_SIZE - 1) * _HASH_SPACE / (sketch[-1] + 1)))
+
+
+def summarize_state(state: dict) -> dict:
+    """
+    Builds the analysis payload from a state:
+        rows, columns, columnNames,
+        numeric columns min/max/avg/std/distinct
+    """
+    numeric_summary = {}
+    for col in state["columnNames"]:
+        col_state = state["numeric"].get(col)
+        if col_state is None:
+            continue
+
+        count = col_state["count"]
+        std = math.sqrt(col_state["m2"] / (count - 1)) if count > 1 else None
+
+        numeric_summary[col] = {
+            "min": col_state["min"],
+            "max": col_state["max"],
+            "avg": round(col_state["mean"], 4) if count else None,
+            "std": None if std is None else round(std, 4),
+            "distinct": _distinct_estimate(col_state["sketch"]),
+        }
+
+    return {
+        "rows": state["rows"],
+        "columns": len(state["columnNames"]),
+        "columnNames": state["columnNames"],
+        "numericSummary": numeric_summary,
+    }
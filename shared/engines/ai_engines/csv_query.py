@@ -0,0 +1,439 @@
+"""
+Grouped aggregation queries for the CSV analysis endpoint.
+
+A query is a small declarative spec sent as JSON, e.g.:
+
+    {
+        "groupBy": ["category"],
+        "aggregations": [
+            {"op": "mean", "column": "price"},
+            {"op": "std", "column": "price"},
+            {"op": "argmax", "column": "price", "return": "title"}
+        ],
+        "filters": [{"column": "stock", "op": ">", "value": 10}],
+        "orderBy": "-mean_price",
+        "limit": 10
+    }
+
+The CSV is streamed in chunks. Each chunk is filtered and grouped with
+pandas, and its per-group partial statistics (count, sum, min, max,
+mean, M2) are folded into an accumulator, so memory is bounded by the
+chunk size plus the number of groups (at most MAX_GROUPS). The
+accumulator is JSON-serialisable and mergeable, which lets grouped
+results be extended with appended rows like the plain summary.
+"""
+
+import json
+import operator
+
+import pandas as pd
+
+from .csv_analysis import compute_state
+
+MAX_GROUPS = 10_000
+MAX_GROUP_KEYS = 5
+
+STAT_OPS = ("sum", "min", "max", "mean", "std")
+ARG_OPS = ("argmax", "argmin")
+COMPARISONS = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+
+class QueryError(ValueError):
+    """A valid query that cannot be run against the uploaded file."""
+
+
+_ROWS = "__rows"
+_VALUE = "__value"
+_RETURN = "__return"
+_STAT_PARTS = ("n", "sum", "min", "max", "mean", "m2")
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _parse_aggregation(agg) -> dict:
+    if not isinstance(agg, dict):
+        raise ValueError("Each aggregation must be an object")
+
+    op = agg.get("op")
+    if op == "count":
+        return {"op": "count", "name": "count"}
+    if op not in STAT_OPS + ARG_OPS:
+        raise ValueError(f"Unsupported aggregation: {op}")
+
+    column = agg.get("column")
+    if not isinstance(column, str) or not column:
+        raise ValueError(f"Aggregation '{op}' requires a column")
+
+    spec = {"op": op, "column": column, "name": f"{op}_{column}"}
+    if op in ARG_OPS:
+        returned = agg.get("return")
+        if not isinstance(returned, str) or not returned:
+            raise ValueError(f"Aggregation '{op}' requires a return column")
+        spec["return"] = returned
+    return spec
+
+
+def _parse_filter(flt) -> dict:
+    if not isinstance(flt, dict):
+        raise ValueError("Each filter must be an object")
+
+    column = flt.get("column")
+    op = flt.get("op")
+    value = flt.get("value")
+
+    if not isinstance(column, str) or not column:
+        raise ValueError("Filters require a column")
+    if op == "in":
+        if not isinstance(value, list) or not value:
+            raise ValueError("Filter 'in' requires a non-empty list of values")
+        if not all(_is_number(v) or isinstance(v, str) for v in value):
+            raise ValueError("Filter 'in' values must be numbers or strings")
+    elif op in ("==", "!="):
+        if not (_is_number(value) or isinstance(value, str) or value is None):
+            raise ValueError(f"Filter '{op}' value must be a number, string or null")
+    elif op in COMPARISONS:
+        if not _is_number(value):
+            raise ValueError(f"Filter '{op}' value must be a number")
+    else:
+        raise ValueError(f"Unsupported filter operator: {op}")
+
+    return {"column": column, "op": op, "value": value}
+
+
+def parse_query(raw):
+    """
+    Validates and normalises a query spec.
+
+    Args:
+        raw: The spec as a JSON string or dict; empty values mean "no query".
+
+    Returns:
+        dict | None: The normalised query, or None when no query was sent.
+
+    Raises:
+        ValueError: If the spec is malformed.
+    """
+    if raw in (None, ""):
+        return None
+    if isinstance(raw, str):
+        try:
+            raw = json.loads(raw)
+        except json.JSONDecodeError as e:
+            raise ValueError("Query must be valid JSON") from e
+    if not isinstance(raw, dict):
+        raise ValueError("Query must be a JSON object")
+
+    group_by = raw.get("groupBy")
+    if isinstance(group_by, str):
+        group_by = [group_by]
+    if (
+        not isinstance(group_by, list)
+        or not group_by
+        or not all(isinstance(key, str) and key for key in group_by)
+    ):
+        raise ValueError("groupBy must list at least one column")
+    if len(group_by) > MAX_GROUP_KEYS:
+        raise ValueError(f"groupBy supports at most {MAX_GROUP_KEYS} columns")
+
+    aggregations = [
+        _parse_aggregation(agg) for agg in raw.get("aggregations") or [{"op": "count"}]
+    ]
+    filters = [_parse_filter(flt) for flt in raw.get("filters") or []]
+
+    names = group_by + [agg["name"] for agg in aggregations]
+    if len(set(names)) != len(names):
+        raise ValueError("Group keys and aggregations must be unique")
+
+    order_by = raw.get("orderBy")
+    if order_by is not None and (
+        not isinstance(order_by, str) or order_by.lstrip("-") not in names
+    ):
+        raise ValueError("orderBy must name a group key or aggregation")
+
+    limit = raw.get("limit")
+    if limit is not None and (not isinstance(limit, int) or limit < 1):
+        raise ValueError("limit must be a positive integer")
+
+    return {
+        "groupBy": group_by,
+        "aggregations": aggregations,
+        "filters": filters,
+        "orderBy": order_by,
+        "limit": limit,
+    }
+
+
+def query_columns(query: dict) -> list:
+    """
+    Returns every CSV column a query reads, in a stable order.
+    """
+    columns = list(query["groupBy"])
+    for agg in query["aggregations"]:
+        columns.extend(agg.get(field) for field in ("column", "return"))
+    columns.extend(flt["column"] for flt in query["filters"])
+    return list(dict.fromkeys(c for c in columns if c))
+
+
+def _stat_columns(query: dict) -> list:
+    return list(
+        dict.fromkeys(
+            agg["column"] for agg in query["aggregations"] if agg["op"] in STAT_OPS
+        )
+    )
+
+
+def _arg_aggregations(query: dict) -> list:
+    return [agg for agg in query["aggregations"] if agg["op"] in ARG_OPS]
+
+
+def _filter_mask(df: pd.DataFrame, filters: list) -> pd.Series:
+    """
+    Vectorised row mask for the query filters. Filter columns are read as
+    text; numeric comparisons coerce them, string comparisons use the raw text.
+    """
+    mask = pd.Series(True, index=df.index)
+    for flt in filters:
+        text = df[flt["column"]]
+        numbers = pd.to_numeric(text, errors="coerce")
+        op, value = flt["op"], flt["value"]
+
+        if op == "in":
+            numeric_values = [v for v in value if _is_number(v)]
+            text_values = [v for v in value if isinstance(v, str)]
+            mask &= numbers.isin(numeric_values) | text.isin(text_values)
+        elif value is None:
+            mask &= text.isna() if op == "==" else text.notna()
+        elif isinstance(value, str):
+            mask &= COMPARISONS[op](text, value).fillna(op == "!=")
+        else:
+            mask &= COMPARISONS[op](numbers, value).fillna(False)
+    return mask
+
+
+def _pick_extreme(frame: pd.DataFrame, keys: list, op: str) -> pd.DataFrame:
+    """
+    Keeps the first row with the largest (argmax) or smallest (argmin)
+    value per group. The stable sort makes earlier rows win ties.
+    """
+    ordered = frame.sort_values(_VALUE, ascending=op == "argmin", kind="stable")
+    return ordered.drop_duplicates(keys)[keys + [_VALUE, _RETURN]]
+
+
+def _chunk_partial(chunk: pd.DataFrame, query: dict) -> dict:
+    """
+    Per-group partial statistics for one chunk of rows.
+    """
+    keys = query["groupBy"]
+    chunk = chunk[_filter_mask(chunk, query["filters"])]
+    chunk = chunk.assign(**{key: chunk[key].fillna("") for key in keys})
+    key_series = [chunk[key] for key in keys]
+
+    stats = chunk.groupby(key_series, sort=False).size().rename(_ROWS).to_frame()
+    for column in _stat_columns(query):
+        grouped = pd.to_numeric(chunk[column], errors="coerce").groupby(
+            key_series, sort=False
+        )
+        count = grouped.count()
+        stats[f"{column}:n"] = count
+        stats[f"{column}:sum"] = grouped.sum()
+        stats[f"{column}:min"] = grouped.min()
+        stats[f"{column}:max"] = grouped.max()
+        stats[f"{column}:mean"] = grouped.mean().fillna(0.0)
+        stats[f"{column}:m2"] = (grouped.var(ddof=0) * count).fillna(0.0)
+
+    args = {}
+    for agg in _arg_aggregations(query):
+        frame = chunk[keys].assign(
+            **{
+                _VALUE: pd.to_numeric(chunk[agg["column"]], errors="coerce"),
+                _RETURN: chunk[agg["return"]],
+            }
+        )
+        args[agg["name"]] = _pick_extreme(
+            frame.dropna(subset=[_VALUE]), keys, agg["op"]
+        )
+
+    return {"stats": stats.reset_index(), "args": args}
+
+
+def _combine(a: dict, b: dict, query: dict) -> dict:
+    """
+    Folds two partial accumulators into one (Chan et al. for mean/M2).
+    """
+    keys = query["groupBy"]
+    stats = pd.concat([a["stats"], b["stats"]], ignore_index=True)
+    key_series = [stats[key] for key in keys]
+
+    spec = {_ROWS: "sum"}
+    combined_columns = {}
+    for column in _stat_columns(query):
+        count = stats[f"{column}:n"]
+        mean = stats[f"{column}:mean"]
+        total = count.groupby(key_series, sort=False).transform("sum")
+        weighted = (count * mean).groupby(key_series, sort=False).transform("sum")
+        group_mean = (weighted / total).where(total > 0, 0.0)
+
+        combined_columns[f"{column}:mean"] = group_mean
+        combined_columns[f"{column}:m2"] = (
+            stats[f"{column}:m2"] + count * (mean - group_mean) ** 2
+        )
+        spec.update(
+            {
+                f"{column}:n": "sum",
+                f"{column}:sum": "sum",
+                f"{column}:min": "min",
+                f"{column}:max": "max",
+                f"{column}:mean": "first",
+                f"{column}:m2": "sum",
+            }
+        )
+
+    stats = stats.assign(**combined_columns)
+    stats = stats.groupby(keys, sort=False).agg(spec).reset_index()
+
+    args = {}
+    for agg in _arg_aggregations(query):
+        frame = pd.concat(
+            [a["args"][agg["name"]], b["args"][agg["name"]]], ignore_index=True
+        )
+        args[agg["name"]] = _pick_extreme(frame, keys, agg["op"])
+
+    return {"stats": stats, "args": args}
+
+
+def _records(frame: pd.DataFrame) -> list:
+    """
+    JSON-safe records: NaN becomes None.
+    """
+    return frame.astype(object).where(frame.notna(), None).to_dict("records")
+
+
+def _dump(acc: dict) -> dict:
+    return {
+        "stats": _records(acc["stats"]),
+        "args": {name: _records(frame) for name, frame in acc["args"].items()},
+    }
+
+
+def _load(state: dict, query: dict) -> dict:
+    keys = query["groupBy"]
+    stat_columns = [
+        f"{column}:{part}" for column in _stat_columns(query) for part in _STAT_PARTS
+    ]
+    stats = pd.DataFrame.from_records(
+        state["stats"], columns=keys + [_ROWS] + stat_columns
+    )
+    stats[stat_columns] = stats[stat_columns].astype("float64")
+    stats[_ROWS] = stats[_ROWS].astype("int64")
+
+    args = {}
+    for agg in _arg_aggregations(query):
+        frame = pd.DataFrame.from_records(
+            state["args"][agg["name"]], columns=keys + [_VALUE, _RETURN]
+        )
+        frame[_VALUE] = frame[_VALUE].astype("float64")
+        args[agg["name"]] = frame
+    return {"stats": stats, "args": args}
+
+
+def compute_state_with_query(file, query: dict) -> dict:
+    """
+    Reads a CSV file once and returns its column state (see
+    csv_analysis.compute_state) with the grouped query state under "groups".
+
+    Raises:
+        QueryError: If the query references unknown columns or produces
+            more than MAX_GROUPS groups.
+        ValueError: If the file cannot be parsed.
+    """
+    columns = query_columns(query)
+    text_columns = set(query["groupBy"]) | {flt["column"] for flt in query["filters"]}
+    acc = None
+
+    def add_chunk(chunk: pd.DataFrame):
+        nonlocal acc
+        missing = [column for column in columns if column not in chunk.columns]
+        if missing:
+            raise QueryError(f"Unknown columns: {', '.join(missing)}")
+
+        try:
+            partial = _chunk_partial(chunk[columns], query)
+        except ValueError as e:
+            raise QueryError(str(e)) from e
+        acc = partial if acc is None else _combine(acc, partial, query)
+        if len(acc["stats"]) > MAX_GROUPS:
+            raise QueryError(f"Query produces more than {MAX_GROUPS} groups")
+
+    state = compute_state(file, text_columns=sorted(text_columns), on_chunk=add_chunk)
+    state["groups"] = _dump(acc)
+    return state
+
+
+def merge_group_states(a: dict, b: dict, query: dict) -> dict:
+    """
+    Combines two grouped states produced by the same query.
+
+    Raises:
+        ValueError: If the merged result has more than MAX_GROUPS groups.
+    """
+    acc = _combine(_load(a, query), _load(b, query), query)
+    if len(acc["stats"]) > MAX_GROUPS:
+        raise ValueError(f"Query produces more than {MAX_GROUPS} groups")
+    return _dump(acc)
+
+
+def summarize_groups(state: dict, query: dict) -> list:
+    """
+    Builds one row per group with the requested aggregations,
+    ordered by orderBy (prefix "-" for descending) or by the group keys.
+    """
+    keys = query["groupBy"]
+    acc = _load(state, query)
+    stats = acc["stats"]
+    result = stats[keys].copy()
+
+    for agg in query["aggregations"]:
+        op, name = agg["op"], agg["name"]
+        if op == "count":
+            result[name] = stats[_ROWS]
+            continue
+        if op in ARG_OPS:
+            picked = acc["args"][name][keys + [_RETURN]].rename(columns={_RETURN: name})
+            result = result.merge(picked, on=keys, how="left")
+            continue
+
+        column = agg["column"]
+        count = stats[f"{column}:n"]
+        if op in ("sum", "min", "max"):
+            result[name] = stats[f"{column}:{op}"]
+        elif op == "mean":
+            result[name] = stats[f"{column}:mean"].where(count > 0).round(4)
+        else:
+            variance = stats[f"{column}:m2"] / (count - 1)
+            result[name] = (variance.where(count > 1) ** 0.5).round(4)
+
+    order_by = query["orderBy"]
+    if order_by:
+        result = result.sort_values(
+            order_by.lstrip("-"),
+            ascending=not order_by.startswith("-"),
+            kind="stable",
+            na_position="last",
+        )
+    else:
+        result = result.sort_values(keys, kind="stable")
+
+    if query["limit"]:
+        result = result.head(query["limit"])
+
+    result[keys] = result[keys].replace("", None)
+    return _records(result)
@@ -0,0 +1,307 @@
+"""
+Sentiment engine used by the /api/ai/sentiment/ endpoint and the
+FastAPI inference service.
+
+SentimentEngine is a drop-in SentimentIntensityAnalyzer that gives the same
+scores as VADER but does less work per call:
+    - the lexicon, booster and negation tables are frozen once at load time
+    - emojis are found with one compiled regex instead of a per-char loop
+    - every token is lower-cased and looked up once, not once per rule
+    - results for repeated (whitespace-normalised) texts come from an LRU cache
+
+Run `python -m ai_engines.sentiment` for a benchmark against plain VADER.
+"""
+
+import re
+import string
+from functools import lru_cache
+from types import MappingProxyType
+
+from vaderSentiment.vaderSentiment import (
+    BOOSTER_DICT,
+    C_INCR,
+    N_SCALAR,
+    NEGATE,
+    SPECIAL_CASES,
+    SentimentIntensityAnalyzer,
+)
+
+SENTIMENT_CACHE_SIZE = 4096
+SENTIMENT_NEUTRAL_THRESHOLD = 0.25
+
+_PUNCTUATION = string.punctuation
+_BOOSTERS = MappingProxyType(dict(BOOSTER_DICT))
+_NEGATIONS = frozenset(NEGATE)
+_SPECIAL_CASES = MappingProxyType(dict(SPECIAL_CASES))
+
+
+def _is_negation(word: str) -> bool:
+    return word in _NEGATIONS or "n't" in word
+
+
+def _compile_char_class(chars) -> re.Pattern:
+    """
+    Compiles a character class from a set of characters, collapsing
+    consecutive code points into ranges so matching stays fast.
+    """
+    runs = []
+    for code in sorted(map(ord, chars)):
+        if runs and code == runs[-1][1] + 1:
+            runs[-1][1] = code
+        else:
+            runs.append([code, code])
+
+    parts = [
+        re.escape(chr(first)) + ("" if first == last else "-" + re.escape(chr(last)))
+        for first, last in runs
+    ]
+    return re.compile("[" + "".join(parts) + "]")
+
+
+class SentimentEngine(SentimentIntensityAnalyzer):
+    """
+    VADER analyzer with a frozen lexicon, compiled emoji tokenizer and a
+    bounded memo cache. polarity_scores() returns the same scores as VADER.
+    """
+
+    def __init__(self, cache_size: int = SENTIMENT_CACHE_SIZE):
+        super().__init__()
+        self.lexicon = MappingProxyType(self.lexicon)
+        self.emojis = MappingProxyType(self.emojis)
+
+        # VADER only matches emojis one character at a time.
+        self._emoji_chars = frozenset(e for e in self.emojis if len(e) == 1)
+        self._emoji_re = _compile_char_class(self._emoji_chars)
+        self._cached_scores = lru_cache(maxsize=cache_size)(self._score)
+
+    def polarity_scores(self, text: str) -> dict:
+        """
+        Returns VADER's neg/neu/pos/compound scores for the text.
+        Whitespace is normalised first since VADER's result does not depend on it.
+        """
+        return dict(self._cached_scores(" ".join(text.split())))
+
+    def cache_info(self):
+        """Returns hit/miss statistics of the memo cache."""
+        return self._cached_scores.cache_info()
+
+    def _replace_emojis(self, text: str) -> str:
+        def describe(match):
+            start = match.start()
+            description = self.emojis[match.group()]
+            if start > 0 and text[start - 1] != " ":
+                return " " + description
+            return description
+
+        return self._emoji_re.sub(describe, text)
+
+    def _score(self, text: str) -> dict:
+        if not self._emoji_chars.isdisjoint(text):
+            text = self._replace_emojis(text)
+        text = text.strip()
+
+        words = []
+        for token in text.split():
+            stripped = token.strip(_PUNCTUATION)
+            words.append(token if len(stripped) <= 2 else stripped)
+
+        lower = [w.lower() for w in words]
+        upper = [w.isupper() for w in words]
+        in_lexicon = [w in self.lexicon for w in lower]
+
+        upper_count = sum(upper)
+        is_cap_diff = 0 < len(words) - upper_count < len(words)
+
+        sentiments = []
+        last = len(words) - 1
+        for i, word in enumerate(lower):
+            if word in _BOOSTERS or (
+                i < last and word == "kind" and lower[i + 1] == "of"
+            ):
+                sentiments.append(0)
+                continue
+            if not in_lexicon[i]:
+                sentiments.append(0)
+                continue
+            sentiments.append(
+                self._valence(lower, upper, in_lexicon, is_cap_diff, i, last)
+            )
+
+        if "but" in lower:
+            sentiments = self._but_check(lower, sentiments)
+
+        return self.score_valence(sentiments, text)
+
+    def _valence(self, lower, upper, in_lexicon, is_cap_diff, i, last) -> float:
+        """
+        Port of SentimentIntensityAnalyzer.sentiment_valence for a lexicon word,
+        working on pre-computed lower-case/upper-case/lexicon flags.
+        """
+        word = lower[i]
+        valence = self.lexicon[word]
+
+        if word == "no" and i != last and in_lexicon[i + 1]:
+            valence = 0.0
+        if (
+            (i > 0 and lower[i - 1] == "no")
+            or (i > 1 and lower[i - 2] == "no")
+            or (i > 2 and lower[i - 3] == "no" and lower[i - 1] in ("or", "nor"))
+        ):
+            valence = self.lexicon[word] * N_SCALAR
+
+        if upper[i] and is_cap_diff:
+            valence = valence + C_INCR if valence > 0 else valence - C_INCR
+
+        for start_i in range(3):
+            j = i - (start_i + 1)
+            if i <= start_i or in_lexicon[j]:
+                continue
+
+            s = 0.0
+            if lower[j] in _BOOSTERS:
+                s = _BOOSTERS[lower[j]]
+                if valence < 0:
+                    s *= -1
+                if upper[j] and is_cap_diff:
+                    s = s + C_INCR if valence > 0 else s - C_INCR
+            if start_i == 1 and s != 0:
+                s = s * 0.95
+            if start_i == 2 and s != 0:
+                s = s * 0.9
+            valence = valence + s
+
+            valence = self._negation(valence, lower, start_i, i)
+            if start_i == 2:
+                valence = self._idioms(valence, lower, i, last)
+
+        if i > 1 and not in_lexicon[i - 1] and lower[i - 1] == "least":
+            if lower[i - 2] != "at" and lower[i - 2] != "very":
+                valence = valence * N_SCALAR
+        elif i > 0 and not in_lexicon[i - 1] and lower[i - 1] == "least":
+            valence = valence * N_SCALAR
+
+        return valence
+
+    @staticmethod
+    def _negation(valence, lower, start_i, i) -> float:
+        """Port of SentimentIntensityAnalyzer._negation_check."""
+        if start_i == 0:
+            if _is_negation(lower[i - 1]):
+                valence = valence * N_SCALAR
+        elif start_i == 1:
+            if lower[i - 2] == "never" and lower[i - 1] in ("so", "this"):
+                valence = valence * 1.25
+            elif lower[i - 2] == "without" and lower[i - 1] == "doubt":
+                pass
+            elif _is_negation(lower[i - 2]):
+                valence = valence * N_SCALAR
+        else:
+            if (lower[i - 3] == "never" and lower[i - 2] in ("so", "this")) or lower[
+                i - 1
+            ] in ("so", "this"):
+                valence = valence * 1.25
+            elif lower[i - 3] == "without" and "doubt" in (lower[i - 2], lower[i - 1]):
+                pass
+            elif _is_negation(lower[i - 3]):
+                valence = valence * N_SCALAR
+        return valence
+
+    @staticmethod
+    def _idioms(valence, lower, i, last) -> float:
+        """Port of SentimentIntensityAnalyzer._special_idioms_check."""
+        onezero = f"{lower[i - 1]} {lower[i]}"
+        twoonezero = f"{lower[i - 2]} {lower[i - 1]} {lower[i]}"
+        twoone = f"{lower[i - 2]} {lower[i - 1]}"
+        threetwoone = f"{lower[i - 3]} {lower[i - 2]} {lower[i - 1]}"
+        threetwo = f"{lower[i - 3]} {lower[i - 2]}"
+
+        for seq in (onezero, twoonezero, twoone, threetwoone, threetwo):
+            if seq in _SPECIAL_CASES:
+                valence = _SPECIAL_CASES[seq]
+                break
+
+        if last > i:
+            zeroone = f"{lower[i]} {lower[i + 1]}"
+            if zeroone in _SPECIAL_CASES:
+                valence = _SPECIAL_CASES[zeroone]
+        if last > i + 1:
+            zeroonetwo = f"{lower[i]} {lower[i + 1]} {lower[i + 2]}"
+            if zeroonetwo in _SPECIAL_CASES:
+                valence = _SPECIAL_CASES[zeroonetwo]
+
+        for n_gram in (threetwoone, threetwo, twoone):
+            if n_gram in _BOOSTERS:
+                valence = valence + _BOOSTERS[n_gram]
+        return valence
+
+
+def sentiment_payload(scores: dict) -> dict:
+    """
+    Response body of the sentiment endpoint: the rounded compound score
+    and a tone using a ±SENTIMENT_NEUTRAL_THRESHOLD neutral band.
+    """
+    polarity = round(scores["compound"], 3)
+
+    if polarity >= SENTIMENT_NEUTRAL_THRESHOLD:
+        tone = "Positive"
+    elif polarity <= -SENTIMENT_NEUTRAL_THRESHOLD:
+        tone = "Negative"
+    else:
+        tone = "Neutral"
+
+    return {"polarity": polarity, "tone": tone}
+
+
+BENCHMARK_CORPUS = [
+    "Task done, thanks!",
+    "Blocked on review again :(",
+    "Looks good to me",
+    "This is NOT acceptable, the build is broken!!!",
+    "Great work on the release 🎉",
+    "Waiting for the client's feedback.",
+    "The fix was kind of okay but the tests are still failing",
+    "Never so happy to close a ticket",
+    "At least it isn't a horrible bug.",
+    "Deployment went smoothly, no issues at all",
+]
+
+
+def benchmark(repeat: int = 200) -> dict:
+    """
+    Times plain VADER against SentimentEngine on BENCHMARK_CORPUS,
+    repeated so short status notes recur as they do in real traffic.
+    """
+    import time
+
+    corpus = BENCHMARK_CORPUS * repeat
+    vader = SentimentIntensityAnalyzer()
+    engine = SentimentEngine()
+
+    start = time.perf_counter()
+    expected = [vader.polarity_scores(text) for text in corpus]
+    vader_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    actual = [engine.polarity_scores(text) for text in corpus]
+    engine_seconds = time.perf_counter() - start
+
+    uncached = SentimentEngine(cache_size=0)
+    start = time.perf_counter()
+    for text in corpus:
+        uncached.polarity_scores(text)
+    uncached_seconds = time.perf_counter() - start
+
+    return {
+        "texts": len(corpus),
+        "identical": expected == actual,
+        "vader_seconds": round(vader_seconds, 4),
+        "engine_seconds": round(engine_seconds, 4),
+        "engine_uncached_seconds": round(uncached_seconds, 4),
+        "speedup": round(vader_seconds / engine_seconds, 1),
+        "uncached_speedup": round(vader_seconds / uncached_seconds, 1),
+    }
+
+
+if __name__ == "__main__":
+    for key, value in benchmark().items():
+        print(f"{key}: {value}")
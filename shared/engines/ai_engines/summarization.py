@@ -0,0 +1,136 @@
+"""
+Text summarization engine shared by the Django API and the inference service.
+
+Strategy by input length:
+    - < 30 words: original text is returned
+    - < 70 words: extractive summary of the best two sentences
+    - otherwise: abstractive summary with BART (facebook/bart-large-cnn)
+
+BART needs the optional model dependencies (`pip install ai-engines[models]`);
+it is imported on first use only.
+"""
+
+import re
+from typing import List
+
+MAX_INPUT_CHARS = 1000
+SHORT_TEXT_WORDS = 30
+MEDIUM_TEXT_WORDS = 70
+
+_summarizer = None
+
+
+def get_summarizer():
+    """Lazy-load BART summarization model."""
+    global _summarizer
+    if _summarizer is None:
+        from transformers import pipeline
+
+        _summarizer = pipeline("summarization", model="facebook/bart-large-cnn")
+    return _summarizer
+
+
+def _split_sentences(text: str) -> List[str]:
+    """
+    Splits a block of text into a list of sentences using punctuation (.!?).
+    """
+    parts = re.split(r"(?<=[.!?])\s+", text.strip())
+    return [p.strip() for p in parts if p.strip()]
+
+
+def _smart_extractive_summary(text: str, max_sentences: int = 2) -> str:
+    """
+    Basic extractive summarization for medium-length text.
+    """
+    sentences = _split_sentences(text)
+    if len(sentences) <= max_sentences:
+        return text
+
+    scored = []
+    for idx, sentence in enumerate(sentences):
+        score = 0
+        if idx == 0:
+            score += 3
+        if idx == len(sentences) - 1:
+            score += 1
+        wc = len(sentence.split())
+        if 10 <= wc <= 25:
+            score += 2
+        scored.append((score, sentence))
+
+    scored.sort(reverse=True, key=lambda x: x[0])
+    selected = [s[1] for s in scored[:max_sentences]]
+    return " ".join(s for s in sentences if s in selected)
+
+
+def needs_model(word_count: int) -> bool:
+    """Whether a text of this length is summarized by BART."""
+    return word_count >= MEDIUM_TEXT_WORDS
+
+
+def bart_options(word_count: int) -> dict:
+    """
+    Generation options for BART, scaled to the input length.
+    Texts with equal options can be summarized in one batch.
+    """
+    return {
+        "max_length": min(int(word_count * 0.6), 130),
+        "min_length": min(int(word_count * 0.3), 40),
+        "do_sample": False,
+        "truncation": True,
+        "num_beams": 4,
+        "length_penalty": 1.0,
+        "early_stopping": True,
+    }
+
+
+def summarize_batch(texts: List[str], options: dict) -> List[str]:
+    """
+    Runs BART over several texts in one call.
+
+    Raises:
+        RuntimeError: If the model fails.
+    """
+    results = get_summarizer()(list(texts), **options)
+    return [result["summary_text"].strip() for result in results]
+
+
+def summarize_text(text: str) -> tuple:
+    """
+    Summarizes a single text with the length-based strategy.
+
+    Returns:
+        tuple: (summary, strategy, word_count)
+
+    Raises:
+        RuntimeError: If the model fails.
+    """
+    word_count = len(text.split())
+
+    if word_count < SHORT_TEXT_WORDS:
+        return text, "original-too-short", word_count
+
+    if not needs_model(word_count):
+        return (
+            _smart_extractive_summary(text, max_sentences=2),
+            "extractive-smart",
+            word_count,
+        )
+
+    summary = summarize_batch([text], bart_options(word_count))[0]
+    return summary, "bart-abstractive", word_count
+
+
+def summary_payload(text: str, summary: str, strategy: str, word_count: int) -> dict:
+    """
+    Response body of the summarize endpoint.
+    """
+    return {
+        "original": text,
+        "summary": summary,
+        "meta": {
+            "strategy": strategy,
+            "original_words": word_count,
+            "summary_words": len(summary.split()),
+        },
+    }